@@ -10,13 +10,223 @@ Author: AI Integration Project
 
 import os
 import re
+import time
+import atexit
+import asyncio
+import hashlib
+import threading
+import logging
+import functools
+import concurrent.futures
+import aiohttp
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 import requests
-from typing import Tuple, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("nl2sql.ai")
+
+
+class RateLimitError(Exception):
+    """Raised when an AI provider answers with HTTP 429."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting provider calls per process.
+    Callers reserve a token and then wait out the returned delay outside
+    the lock, so the same bucket serves request threads and event loops.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens the bucket holds (the allowed burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """
+        Take a token, borrowing against future refills if none is left.
+        
+        Returns:
+            Seconds the caller must wait before using the token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+    
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def aacquire(self) -> None:
+        """Wait on the event loop until a token is available."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class PromptCache:
+    """
+    Cache of prompt -> generated SQL, placed in front of the LLM call.
+    Exact repeats are served from an LRU dict keyed by a prompt hash.
+    Near-duplicate prompts can optionally be matched by sentence-embedding
+    similarity (requires sentence-transformers and numpy).
+    All entries are dropped when the provider or schema changes.
+    """
+    
+    def __init__(self, max_size: int = 1024, semantic: bool = False,
+                 model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.95):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of cached prompts
+            semantic: Enable the embedding-similarity lookup
+            model_name: sentence-transformers model used for embeddings
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._scope: Optional[str] = None
+        self._exact: "OrderedDict[bytes, str]" = OrderedDict()
+        
+        # Semantic layer: one normalized embedding row per cached prompt
+        self._model = None
+        self._embeddings = None
+        self._embedding_sql: List[str] = []
+        if semantic:
+            self._load_model(model_name)
+    
+    def _load_model(self, model_name: str) -> None:
+        """Load the embedding model, disabling the semantic layer if unavailable."""
+        try:
+            import numpy
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            logger.warning("Semantic prompt cache disabled: sentence-transformers is not installed")
+            return
+        self._np = numpy
+        self._model = SentenceTransformer(model_name)
+    
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        """Collapse whitespace so trivially different prompts share a key."""
+        return ' '.join(prompt.split())
+    
+    def _embed(self, normalized_prompt: str):
+        """Return the unit-length embedding of a normalized prompt."""
+        return self._model.encode(normalized_prompt.lower(), normalize_embeddings=True)
+    
+    def _check_scope(self, scope: str) -> None:
+        """Drop all entries when the provider/schema scope changes. Caller holds the lock."""
+        if scope != self._scope:
+            self._scope = scope
+            self._exact.clear()
+            self._embeddings = None
+            self._embedding_sql = []
+    
+    def get(self, scope: str, prompt: str) -> Optional[str]:
+        """
+        Look up cached SQL for a prompt.
+        
+        Args:
+            scope: Provider and schema fingerprint the entry must belong to
+            prompt: User's natural language prompt
+            
+        Returns:
+            Cached SQL, or None on a miss
+        """
+        normalized = self.normalize(prompt)
+        key = hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+        
+        with self._lock:
+            self._check_scope(scope)
+            sql = self._exact.get(key)
+            if sql is not None:
+                self._exact.move_to_end(key)
+                return sql
+            if self._model is None or self._embeddings is None:
+                return None
+        
+        embedding = self._embed(normalized)
+        
+        with self._lock:
+            if scope != self._scope or self._embeddings is None:
+                return None
+            scores = self._embeddings @ embedding
+            best = int(scores.argmax())
+            if scores[best] >= self.threshold:
+                return self._embedding_sql[best]
+        return None
+    
+    def put(self, scope: str, prompt: str, sql: str) -> None:
+        """
+        Store the SQL generated for a prompt.
+        
+        Args:
+            scope: Provider and schema fingerprint the entry belongs to
+            prompt: User's natural language prompt
+            sql: Validated SQL generated for the prompt
+        """
+        normalized = self.normalize(prompt)
+        key = hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+        embedding = self._embed(normalized) if self._model is not None else None
+        
+        with self._lock:
+            self._check_scope(scope)
+            self._exact[key] = sql
+            self._exact.move_to_end(key)
+            if len(self._exact) > self.max_size:
+                self._exact.popitem(last=False)
+            
+            if embedding is not None:
+                row = embedding.reshape(1, -1)
+                if self._embeddings is None:
+                    self._embeddings = row
+                else:
+                    self._embeddings = self._np.vstack([self._embeddings, row])[-self.max_size:]
+                self._embedding_sql = (self._embedding_sql + [sql])[-self.max_size:]
+
+
+class AsyncClient:
+    """
+    aiohttp session and in-flight limit for one event loop.
+    Both are bound to the loop they were created on.
+    """
+    
+    def __init__(self, session: aiohttp.ClientSession, slots: asyncio.Semaphore):
+        """
+        Args:
+            session: HTTP session for provider calls
+            slots: Limits the requests in flight at once
+        """
+        self.session = session
+        self.slots = slots
+    
+    async def aclose(self) -> None:
+        """Close the HTTP session."""
+        await self.session.close()
+
 
 class AIService:
     """
@@ -31,6 +241,55 @@ class AIService:
         'MERGE', 'CALL', 'LOAD', 'REPLACE', 'LOCK', 'UNLOCK'
     ]
     
+    # System prompt kept short: input tokens drive LLM latency and cost
+    SYSTEM_PROMPT_TEMPLATE = (
+        "You convert natural language requests into one MySQL SELECT query.\n"
+        "Rules: output only the SQL, no markdown or explanations, ending with ';'. "
+        "Never use {forbidden}. "
+        "Use only tables and columns from the schema; join related tables with explicit ON conditions "
+        "and short aliases; use GROUP BY with aggregates. "
+        "If no SELECT can answer the request, output: ERROR: Cannot generate a valid SELECT query\n"
+        "{schema}"
+    )
+    
+    # Static request options, shared by every provider call
+    OPENAI_OPTIONS = {
+        "model": "gpt-4",  # Can also use "gpt-3.5-turbo" for cost savings
+        "temperature": 0.1,  # Low temperature for more deterministic output
+        "max_tokens": 256,  # SELECT queries rarely need more
+        "response_format": {"type": "text"}
+    }
+    GEMINI_GENERATION_CONFIG = {
+        "temperature": 0.1,
+        "maxOutputTokens": 500,
+        "topP": 0.8,
+        "topK": 10
+    }
+    GEMINI_HEADERS = {
+        "Content-Type": "application/json"
+    }
+    
+    # Longest prompt sent to the LLM; larger inputs are rejected up front
+    MAX_PROMPT_LENGTH = int(os.getenv('MAX_PROMPT_LENGTH', 4096))
+    
+    # Seconds a duplicate request waits for an identical in-flight one
+    INFLIGHT_WAIT_TIMEOUT = 60
+    
+    # Precompiled patterns used on every request
+    _CODE_FENCE_RE = re.compile(r'```(?:sql|mysql)?\s*', re.IGNORECASE)
+    _PREFIX_RE = re.compile(
+        r"here'?s the query:|here is the query:|the sql query is:|sql query:|query:",
+        re.IGNORECASE
+    )
+    _PROMPT_META_RE = re.compile(r';|--|/\*')
+    _CONTROL_CHAR_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+    _SELECT_RE = re.compile(r'SELECT\s+.+?;', re.IGNORECASE | re.DOTALL)
+    # Forbidden keywords and comment markers, found in a single scan
+    _VALIDATE_RE = re.compile(
+        r'(?P<bad>\b(?:' + '|'.join(FORBIDDEN_KEYWORDS) + r')\b)|(?P<cmt>--|/\*)',
+        re.IGNORECASE
+    )
+    
     def __init__(self):
         """Initialize AI service with API keys and provider selection."""
         self.provider = os.getenv('AI_PROVIDER', 'gemini').lower()
@@ -40,12 +299,57 @@ class AIService:
         # API endpoints
         self.openai_url = "https://api.openai.com/v1/chat/completions"
         self.gemini_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+        self._gemini_request_url = f"{self.gemini_url}?key={self.gemini_key}"
+        self._openai_headers = {
+            "Authorization": f"Bearer {self.openai_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # Persistent HTTP session so repeated calls reuse the open TLS connection
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset(["POST"]),
+                raise_on_status=False
+            )
+        ))
+        atexit.register(self.http.close)
+        
+        # Prompt -> SQL cache in front of the LLM call
+        self.prompt_cache = PromptCache(
+            max_size=int(os.getenv('PROMPT_CACHE_SIZE', 1024)),
+            semantic=os.getenv('SEMANTIC_CACHE', 'False').lower() == 'true',
+            model_name=os.getenv('SEMANTIC_CACHE_MODEL', 'all-MiniLM-L6-v2'),
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.95))
+        )
         
-        print(f"✅ AI Service initialized with provider: {self.provider.upper()}")
+        # Identical prompts currently waiting on the LLM, so duplicates can share one call
+        self._inflight: Dict[Tuple[str, str], concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Client-side limits so concurrent requests stay under provider rate limits
+        self.max_inflight = int(os.getenv('LLM_MAX_INFLIGHT', 32))
+        self.requests_per_minute = int(os.getenv('LLM_QPM', 500))
+        self._sync_slots = threading.BoundedSemaphore(self.max_inflight)
+        # Shared by the sync and async paths; bursts up to LLM_MAX_INFLIGHT calls
+        self._rate_limiter = TokenBucket(
+            rate=self.requests_per_minute / 60,
+            capacity=min(self.max_inflight, self.requests_per_minute)
+        )
+        
+        logger.info("AI Service initialized with provider: %s", self.provider.upper())
     
-    def get_system_prompt(self, schema_context: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def get_system_prompt(schema_context: str) -> str:
         """
         Generate the system prompt for the AI model.
+        Cached per schema, so repeated calls return the same string object.
         
         Args:
             schema_context: Database schema description
@@ -53,90 +357,25 @@ class AIService:
         Returns:
             System prompt string
         """
-        return f"""You are an expert MySQL query generator. Your ONLY job is to convert natural language requests into valid MySQL SELECT queries.
-
-CRITICAL RULES:
-1. Return ONLY the SQL query - no explanations, no markdown, no code blocks
-2. Generate ONLY SELECT queries - never INSERT, UPDATE, DELETE, DROP, or any data-modifying operations
-3. Use proper MySQL syntax with correct table and column names
-4. If the request cannot be converted to a SELECT query, return: ERROR: Cannot generate a valid SELECT query
-
-QUERY BUILDING GUIDELINES:
-5. Study the schema carefully to understand table relationships
-6. Use appropriate JOINs when querying across multiple tables:
-   - Use INNER JOIN when you need matching records from both tables
-   - Use LEFT JOIN when you want all records from the left table
-   - Always specify the JOIN condition with ON clause
-7. Add appropriate WHERE clauses based on the natural language conditions
-8. Use table aliases for clarity when joining tables (e.g., 'e' for employees, 'd' for departments)
-9. For aggregations (COUNT, SUM, AVG, etc.), use GROUP BY when needed
-10. For ordering results, use ORDER BY with ASC or DESC
-11. End all queries with a semicolon
-
-{schema_context}
-
-QUERY PATTERNS FOR COMPLEX JOINS:
-
-Single table query:
-SELECT * FROM employees WHERE age > 30;
-
-Join two tables:
-SELECT e.name, d.name AS department_name 
-FROM employees e 
-INNER JOIN departments d ON e.department_id = d.id;
-
-Join three tables:
-SELECT e.name AS employee_name, d.name AS department_name, p.name AS project_name
-FROM employees e
-INNER JOIN departments d ON e.department_id = d.id
-INNER JOIN employee_projects ep ON e.id = ep.employee_id
-INNER JOIN projects p ON ep.project_id = p.id;
-
-Aggregation with JOIN:
-SELECT d.name AS department, COUNT(e.id) AS employee_count
-FROM departments d
-LEFT JOIN employees e ON d.id = e.department_id
-GROUP BY d.id, d.name;
-
-Complex filtering with JOIN:
-SELECT e.name, e.salary, d.name AS department
-FROM employees e
-INNER JOIN departments d ON e.department_id = d.id
-WHERE e.salary > 70000 AND d.name = 'Engineering'
-ORDER BY e.salary DESC;
-
-IMPORTANT: Your response must contain ONLY the SQL query, nothing else. No explanations, no formatting, no markdown code blocks.
-
-Examples of VALID responses:
-SELECT * FROM employees;
-SELECT e.name, d.name FROM employees e JOIN departments d ON e.department_id = d.id;
-
-Examples of INVALID responses:
-```sql SELECT * FROM employees; ```
-Here's the query: SELECT * FROM employees;
-The SQL query would be: SELECT * FROM employees;"""
+        return AIService.SYSTEM_PROMPT_TEMPLATE.format(
+            forbidden=', '.join(AIService.FORBIDDEN_KEYWORDS),
+            schema=schema_context
+        )
     
-    def _call_openai(self, prompt: str, schema_context: str) -> Tuple[bool, str]:
+    @functools.lru_cache(maxsize=4)
+    def _openai_payload_parts(self, schema_context: str) -> Tuple[bytes, bytes]:
         """
-        Call OpenAI API to generate SQL.
+        Pre-serialize everything in the OpenAI payload except the user message.
+        The system prompt only depends on the schema, so it is encoded once.
         
         Args:
-            prompt: User's natural language prompt
             schema_context: Database schema description
             
         Returns:
-            Tuple of (success: bool, sql_or_error: str)
+            Tuple of (json_prefix: bytes, json_suffix: bytes) around the user message
         """
-        if not self.openai_key or self.openai_key == 'your_openai_api_key_here':
-            return False, "OpenAI API key not configured"
-        
-        headers = {
-            "Authorization": f"Bearer {self.openai_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
-            "model": "gpt-4",  # Can also use "gpt-3.5-turbo" for cost savings
+            **self.OPENAI_OPTIONS,
             "messages": [
                 {
                     "role": "system",
@@ -144,29 +383,150 @@ The SQL query would be: SELECT * FROM employees;"""
                 },
                 {
                     "role": "user",
-                    "content": f"Convert this to a MySQL SELECT query: {prompt}"
+                    "content": ""
+                }
+            ]
+        }
+        # Split the encoded payload at the empty user message
+        encoded = orjson.dumps(payload)
+        split_at = encoded.rindex(b'""') + 1
+        return encoded[:split_at], encoded[split_at:]
+    
+    @functools.lru_cache(maxsize=4)
+    def _gemini_payload_parts(self, schema_context: str) -> Tuple[bytes, bytes]:
+        """
+        Pre-serialize everything in the Gemini payload except the user request.
+        
+        Args:
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (json_prefix: bytes, json_suffix: bytes) around the user request
+        """
+        # Combine system prompt and user prompt for Gemini
+        payload = {
+            "generationConfig": self.GEMINI_GENERATION_CONFIG,
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": f"{self.get_system_prompt(schema_context)}\n\nUser Request: "
+                        }
+                    ]
                 }
-            ],
-            "temperature": 0.1,  # Low temperature for more deterministic output
-            "max_tokens": 500
+            ]
         }
+        # Split the encoded payload at the closing quote of the text field
+        encoded = orjson.dumps(payload)
+        split_at = encoded.rindex(b'"}]}]}')
+        return encoded[:split_at], encoded[split_at:]
+    
+    @staticmethod
+    def _json_string_body(text: str) -> bytes:
+        """Encode text as the inside of a JSON string literal (no quotes)."""
+        return orjson.dumps(text)[1:-1]
+    
+    def _openai_request(self, prompt: str, schema_context: str) -> Tuple[dict, bytes]:
+        """
+        Build the headers and JSON body for an OpenAI chat completion call.
+        
+        Args:
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (headers: dict, body: bytes)
+        """
+        prefix, suffix = self._openai_payload_parts(schema_context)
+        body = prefix + self._json_string_body(f"Convert this to a MySQL SELECT query: {prompt}") + suffix
+        return self._openai_headers, body
+    
+    def _gemini_request(self, prompt: str, schema_context: str) -> Tuple[str, dict, bytes]:
+        """
+        Build the URL, headers and JSON body for a Gemini generateContent call.
         
+        Args:
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (url: str, headers: dict, body: bytes)
+        """
+        prefix, suffix = self._gemini_payload_parts(schema_context)
+        body = prefix + self._json_string_body(f"{prompt}\n\nSQL Query:") + suffix
+        return self._gemini_request_url, self.GEMINI_HEADERS, body
+    
+    @staticmethod
+    def _extract_gemini_text(data: dict) -> Optional[str]:
+        """
+        Extract the generated text from a Gemini response body.
+        
+        Args:
+            data: Decoded JSON response from Gemini
+            
+        Returns:
+            Generated text, or None if the response has no candidates
+        """
+        if 'candidates' in data and len(data['candidates']) > 0:
+            candidate = data['candidates'][0]
+            if 'content' in candidate and 'parts' in candidate['content']:
+                return candidate['content']['parts'][0]['text'].strip()
+        return None
+    
+    @staticmethod
+    def _api_error(provider: str, status_code: int, text: str) -> str:
+        """
+        Build an error message from a failed provider response.
+        Uses the JSON error message when there is one and falls back to the
+        start of the raw body (e.g. an HTML page from a 502/504 gateway).
+        
+        Args:
+            provider: Provider name for the message
+            status_code: HTTP status code
+            text: Response body
+            
+        Returns:
+            Error message string
+        """
+        error_msg = None
         try:
-            response = requests.post(
-                self.openai_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            error_msg = orjson.loads(text).get('error', {}).get('message')
+        except (orjson.JSONDecodeError, AttributeError):
+            pass
+        return f"{provider} API error ({status_code}): {error_msg or text[:200]}"
+    
+    def _call_openai(self, prompt: str, schema_context: str) -> Tuple[bool, str]:
+        """
+        Call OpenAI API to generate SQL.
+        
+        Args:
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str)
+        """
+        if not self.openai_key or self.openai_key == 'your_openai_api_key_here':
+            return False, "OpenAI API key not configured"
+        
+        headers, body = self._openai_request(prompt, schema_context)
+        
+        try:
+            self._rate_limiter.acquire()
+            with self._sync_slots:
+                response = self.http.post(
+                    self.openai_url,
+                    headers=headers,
+                    data=body,
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 data = response.json()
                 sql = data['choices'][0]['message']['content'].strip()
                 return True, sql
             else:
-                error_data = response.json()
-                error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-                return False, f"OpenAI API error: {error_msg}"
+                return False, self._api_error("OpenAI", response.status_code, response.text)
                 
         except requests.exceptions.Timeout:
             return False, "OpenAI API request timed out"
@@ -189,63 +549,158 @@ The SQL query would be: SELECT * FROM employees;"""
         if not self.gemini_key or self.gemini_key == 'your_gemini_api_key_here':
             return False, "Gemini API key not configured. Please add your GEMINI_API_KEY to the .env file."
         
-        url = f"{self.gemini_url}?key={self.gemini_key}"
+        url, headers, body = self._gemini_request(prompt, schema_context)
         
-        headers = {
-            "Content-Type": "application/json"
-        }
+        try:
+            self._rate_limiter.acquire()
+            with self._sync_slots:
+                response = self.http.post(
+                    url,
+                    headers=headers,
+                    data=body,
+                    timeout=30
+                )
+            
+            if response.status_code == 200:
+                sql = self._extract_gemini_text(response.json())
+                if sql is not None:
+                    return True, sql
+                
+                return False, "No response generated by Gemini"
+            else:
+                return False, self._api_error("Gemini", response.status_code, response.text)
+                
+        except requests.exceptions.Timeout:
+            return False, "Gemini API request timed out"
+        except requests.exceptions.RequestException as e:
+            return False, f"Gemini API request failed: {str(e)}"
+        except Exception as e:
+            return False, f"Unexpected error: {str(e)}"
+    
+    # ============================================
+    # Async provider calls
+    # ============================================
+    
+    def _open_client(self) -> AsyncClient:
+        """
+        Create the aiohttp session and in-flight limit for one event loop.
+        These objects are bound to the loop they are created on, so they
+        belong to the caller (e.g. one batch) and are never stored on the
+        shared AIService instance.
         
-        # Combine system prompt and user prompt for Gemini
-        full_prompt = f"""{self.get_system_prompt(schema_context)}
-
-User Request: {prompt}
-
-SQL Query:"""
+        Returns:
+            AsyncClient to be closed with aclose() when the caller is done
+        """
+        return AsyncClient(
+            session=aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)),
+            slots=asyncio.Semaphore(self.max_inflight)
+        )
+    
+    async def _post_async(self, client: AsyncClient, url: str, headers: dict,
+                          body: bytes) -> Tuple[int, str]:
+        """
+        POST to a provider within the in-flight limit and the shared rate limit.
+        HTTP 429 responses are retried with jittered exponential backoff.
         
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": full_prompt
-                        }
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "temperature": 0.1,
-                "maxOutputTokens": 500,
-                "topP": 0.8,
-                "topK": 10
-            }
-        }
+        Args:
+            client: Session and in-flight limit of the running event loop
+            url: Provider endpoint
+            headers: Request headers
+            body: Encoded JSON body
+            
+        Returns:
+            Tuple of (status: int, response_text: str)
+            
+        Raises:
+            RateLimitError: If the provider still answers 429 after all retries
+        """
+        async for attempt in AsyncRetrying(
+            wait=wait_exponential_jitter(initial=0.5, max=8),
+            stop=stop_after_attempt(3),
+            retry=retry_if_exception_type(RateLimitError),
+            reraise=True
+        ):
+            with attempt:
+                await self._rate_limiter.aacquire()
+                async with client.slots:
+                    async with client.session.post(url, headers=headers, data=body) as response:
+                        status, text = response.status, await response.text()
+                if status == 429:
+                    raise RateLimitError(text)
+                return status, text
+    
+    async def _call_openai_async(self, client: AsyncClient, prompt: str,
+                                 schema_context: str) -> Tuple[bool, str]:
+        """
+        Async variant of _call_openai.
+        
+        Args:
+            client: Session and in-flight limit of the running event loop
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str)
+        """
+        if not self.openai_key or self.openai_key == 'your_openai_api_key_here':
+            return False, "OpenAI API key not configured"
+        
+        headers, body = self._openai_request(prompt, schema_context)
         
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            status, text = await self._post_async(client, self.openai_url, headers, body)
             
-            if response.status_code == 200:
-                data = response.json()
+            if status == 200:
+                data = orjson.loads(text)
+                sql = data['choices'][0]['message']['content'].strip()
+                return True, sql
+            else:
+                return False, self._api_error("OpenAI", status, text)
                 
-                # Extract text from Gemini response
-                if 'candidates' in data and len(data['candidates']) > 0:
-                    candidate = data['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        sql = candidate['content']['parts'][0]['text'].strip()
-                        return True, sql
+        except RateLimitError:
+            return False, "OpenAI API rate limit exceeded. Please try again shortly."
+        except asyncio.TimeoutError:
+            return False, "OpenAI API request timed out"
+        except aiohttp.ClientError as e:
+            return False, f"OpenAI API request failed: {str(e)}"
+        except Exception as e:
+            return False, f"Unexpected error: {str(e)}"
+    
+    async def _call_gemini_async(self, client: AsyncClient, prompt: str,
+                                 schema_context: str) -> Tuple[bool, str]:
+        """
+        Async variant of _call_gemini.
+        
+        Args:
+            client: Session and in-flight limit of the running event loop
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str)
+        """
+        if not self.gemini_key or self.gemini_key == 'your_gemini_api_key_here':
+            return False, "Gemini API key not configured. Please add your GEMINI_API_KEY to the .env file."
+        
+        url, headers, body = self._gemini_request(prompt, schema_context)
+        
+        try:
+            status, text = await self._post_async(client, url, headers, body)
+            
+            if status == 200:
+                sql = self._extract_gemini_text(orjson.loads(text))
+                if sql is not None:
+                    return True, sql
                 
                 return False, "No response generated by Gemini"
             else:
-                error_msg = response.text
-                return False, f"Gemini API error: {error_msg}"
+                return False, self._api_error("Gemini", status, text)
                 
-        except requests.exceptions.Timeout:
+        except RateLimitError:
+            return False, "Gemini API rate limit exceeded. Please try again shortly."
+        except asyncio.TimeoutError:
             return False, "Gemini API request timed out"
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             return False, f"Gemini API request failed: {str(e)}"
         except Exception as e:
             return False, f"Unexpected error: {str(e)}"
@@ -262,29 +717,19 @@ SQL Query:"""
             Cleaned SQL query
         """
         # Remove markdown code blocks
-        sql = re.sub(r'```sql\s*', '', sql, flags=re.IGNORECASE)
-        sql = re.sub(r'```mysql\s*', '', sql, flags=re.IGNORECASE)
-        sql = re.sub(r'```\s*', '', sql)
-        
-        # Remove common prefixes
-        prefixes_to_remove = [
-            "Here's the query:",
-            "Here is the query:",
-            "The SQL query is:",
-            "SQL Query:",
-            "Query:",
-        ]
-        for prefix in prefixes_to_remove:
-            sql = re.sub(re.escape(prefix), '', sql, flags=re.IGNORECASE)
+        sql = self._CODE_FENCE_RE.sub('', sql)
+        
+        # Remove common prefixes ("Here's the query:", "SQL Query:", ...)
+        sql = self._PREFIX_RE.sub('', sql)
         
         # Remove leading/trailing whitespace and newlines
         sql = sql.strip()
         
         # Extract just the SQL statement if there's extra text
         # Look for SELECT statement
-        select_match = re.search(r'(SELECT\s+.+?;)', sql, re.IGNORECASE | re.DOTALL)
+        select_match = self._SELECT_RE.search(sql)
         if select_match:
-            sql = select_match.group(1)
+            sql = select_match.group(0)
         
         # Ensure query ends with semicolon
         if sql and not sql.endswith(';'):
@@ -306,55 +751,65 @@ SQL Query:"""
             return False, "Empty SQL query"
         
         # Check for ERROR response from AI
-        if sql.upper().startswith('ERROR:'):
+        if sql[:6].upper() == 'ERROR:':
             return False, sql
         
-        # Convert to uppercase for checking
-        sql_upper = sql.upper()
-        
         # Check that it starts with SELECT
-        if not sql_upper.strip().startswith('SELECT'):
+        if sql.lstrip()[:6].upper() != 'SELECT':
             return False, "Only SELECT queries are allowed"
         
-        # Check for forbidden keywords
-        for keyword in self.FORBIDDEN_KEYWORDS:
-            # Use word boundary to avoid false positives
-            pattern = r'\b' + keyword + r'\b'
-            if re.search(pattern, sql_upper):
-                return False, f"Forbidden operation detected: {keyword}"
+        # Check for forbidden keywords and comment injection in one pass
+        # (word boundaries avoid false positives such as "updated_at")
+        match = self._VALIDATE_RE.search(sql)
+        if match:
+            if match.group('bad'):
+                return False, f"Forbidden operation detected: {match.group('bad').upper()}"
+            return False, "SQL comments not allowed"
         
         # Check for multiple statements (SQL injection attempt)
-        # Count semicolons (should be 0 or 1, at the end)
-        semicolon_count = sql.count(';')
-        if semicolon_count > 1:
+        # Only one semicolon is allowed; stop at the second one found
+        first_semicolon = sql.find(';')
+        if first_semicolon != -1 and sql.find(';', first_semicolon + 1) != -1:
             return False, "Multiple SQL statements not allowed"
         
-        # Check for comment injection
-        if '--' in sql or '/*' in sql:
-            return False, "SQL comments not allowed"
-        
         return True, "SQL query is valid"
     
-    def generate_sql(self, prompt: str, schema_context: str) -> Tuple[bool, str, str]:
+    def check_prompt(self, prompt: str) -> Tuple[bool, str]:
         """
-        Main method to generate SQL from natural language.
+        Cheap checks run before a prompt is sent to the LLM.
+        Rejects inputs that would only waste a slow, billed API call.
         
         Args:
             prompt: User's natural language prompt
-            schema_context: Database schema description
             
         Returns:
-            Tuple of (success: bool, sql_or_error: str, message: str)
+            Tuple of (is_valid: bool, message: str)
         """
         if not prompt or not prompt.strip():
-            return False, "", "Empty prompt provided"
+            return False, "Empty prompt provided"
         
-        # Call appropriate AI provider
-        if self.provider == 'openai':
-            success, result = self._call_openai(prompt, schema_context)
-        else:
-            success, result = self._call_gemini(prompt, schema_context)
+        if len(prompt) > self.MAX_PROMPT_LENGTH:
+            return False, f"Prompt too long (maximum {self.MAX_PROMPT_LENGTH} characters)"
+        
+        if self._PROMPT_META_RE.search(prompt):
+            return False, "Prompt contains SQL meta-characters (;, -- or /*)"
+        
+        if self._CONTROL_CHAR_RE.search(prompt):
+            return False, "Prompt contains control characters"
+        
+        return True, "Prompt is valid"
+    
+    def _finalize_sql(self, success: bool, result: str) -> Tuple[bool, str, str]:
+        """
+        Clean and validate a raw provider response.
         
+        Args:
+            success: Whether the provider call succeeded
+            result: Raw SQL response or error message
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str, message: str)
+        """
         if not success:
             return False, "", result
         
@@ -368,28 +823,226 @@ SQL Query:"""
             return False, sql, validation_message
         
         return True, sql, "SQL generated and validated successfully"
+    
+    def _cache_scope(self, schema_context: str, schema_hash: Optional[str] = None) -> str:
+        """
+        Build the prompt-cache scope for the current provider and schema.
+        Cached SQL is only reused while both stay the same.
+        
+        Args:
+            schema_context: Database schema description
+            schema_hash: Precomputed fingerprint of schema_context, if known
+            
+        Returns:
+            Scope string for PromptCache
+        """
+        if schema_hash is None:
+            schema_hash = hashlib.blake2b(schema_context.encode(), digest_size=16).hexdigest()
+        return f"{self.provider}|{schema_hash}"
+    
+    def _cached_sql(self, scope: str, prompt: str) -> Optional[Tuple[bool, str, str]]:
+        """
+        Return a generate_sql result from the prompt cache, if present.
+        Cached SQL is re-validated before being returned.
+        
+        Args:
+            scope: Prompt-cache scope from _cache_scope
+            prompt: User's natural language prompt
+            
+        Returns:
+            Tuple of (success: bool, sql: str, message: str), or None on a miss
+        """
+        sql = self.prompt_cache.get(scope, prompt)
+        if sql is None:
+            return None
+        
+        is_valid, validation_message = self.validate_sql(sql)
+        if not is_valid:
+            return False, sql, validation_message
+        
+        return True, sql, "SQL served from cache"
+    
+    def generate_sql(self, prompt: str, schema_context: str,
+                     schema_hash: Optional[str] = None) -> Tuple[bool, str, str]:
+        """
+        Main method to generate SQL from natural language.
+        
+        Args:
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            schema_hash: Precomputed fingerprint of schema_context, if known
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str, message: str)
+        """
+        prompt_ok, prompt_message = self.check_prompt(prompt)
+        if not prompt_ok:
+            return False, "", prompt_message
+        
+        # Serve repeated prompts without calling the LLM
+        scope = self._cache_scope(schema_context, schema_hash)
+        cached = self._cached_sql(scope, prompt)
+        if cached is not None:
+            return cached
+        
+        # Coalesce with an identical request that is already waiting on the LLM
+        key = (scope, PromptCache.normalize(prompt))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+        
+        if not is_leader:
+            try:
+                return future.result(timeout=self.INFLIGHT_WAIT_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                return False, "", "Timed out waiting for an identical request to finish"
+        
+        try:
+            # Call appropriate AI provider
+            if self.provider == 'openai':
+                success, result = self._call_openai(prompt, schema_context)
+            else:
+                success, result = self._call_gemini(prompt, schema_context)
+            
+            generated = self._finalize_sql(success, result)
+            if generated[0]:
+                self.prompt_cache.put(scope, prompt, generated[1])
+            
+            future.set_result(generated)
+            return generated
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    async def agenerate_sql(self, prompt: str, schema_context: str,
+                            schema_hash: Optional[str] = None,
+                            client: Optional[AsyncClient] = None) -> Tuple[bool, str, str]:
+        """
+        Async variant of generate_sql. Lets several LLM requests
+        overlap their network wait on a single event loop.
+        
+        Args:
+            prompt: User's natural language prompt
+            schema_context: Database schema description
+            schema_hash: Precomputed fingerprint of schema_context, if known
+            client: Session and in-flight limit to use; a temporary one is opened
+                (and closed again) when not given
+            
+        Returns:
+            Tuple of (success: bool, sql_or_error: str, message: str)
+        """
+        prompt_ok, prompt_message = self.check_prompt(prompt)
+        if not prompt_ok:
+            return False, "", prompt_message
+        
+        # Serve repeated prompts without calling the LLM
+        scope = self._cache_scope(schema_context, schema_hash)
+        cached = self._cached_sql(scope, prompt)
+        if cached is not None:
+            return cached
+        
+        if client is None:
+            client = self._open_client()
+            try:
+                return await self.agenerate_sql(prompt, schema_context, schema_hash, client)
+            finally:
+                await client.aclose()
+        
+        # Call appropriate AI provider
+        if self.provider == 'openai':
+            success, result = await self._call_openai_async(client, prompt, schema_context)
+        else:
+            success, result = await self._call_gemini_async(client, prompt, schema_context)
+        
+        generated = self._finalize_sql(success, result)
+        if generated[0]:
+            self.prompt_cache.put(scope, prompt, generated[1])
+        
+        return generated
+    
+    async def agenerate_sql_batch(self, prompts: List[str], schema_context: str,
+                                  schema_hash: Optional[str] = None) -> List[Tuple[bool, str, str]]:
+        """
+        Generate SQL for several prompts concurrently.
+        The batch opens its own aiohttp session and closes it once done, so
+        concurrent batches on other threads' event loops never share one.
+        
+        Args:
+            prompts: List of natural language prompts
+            schema_context: Database schema description
+            schema_hash: Precomputed fingerprint of schema_context, if known
+            
+        Returns:
+            List of (success: bool, sql_or_error: str, message: str), in prompt order
+        """
+        client = self._open_client()
+        try:
+            return await asyncio.gather(*[
+                self.agenerate_sql(p, schema_context, schema_hash, client) for p in prompts
+            ])
+        finally:
+            await client.aclose()
 
 
-# Create a singleton instance for use across the application
-ai_service = AIService()
+# Shared instance, created on first use so importing this module stays cheap
+_ai_service: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+
+
+def get_ai_service() -> AIService:
+    """
+    Get the shared AIService instance, creating it on first use.
+    
+    Returns:
+        AIService singleton
+    """
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
 
 
 # ============================================
 # Module-level function for convenience
 # ============================================
 
-def convert_to_sql(prompt: str, schema_context: str) -> Tuple[bool, str, str]:
+def convert_to_sql(prompt: str, schema_context: str, schema_hash: Optional[str] = None) -> Tuple[bool, str, str]:
     """
     Convert natural language to SQL query.
     
     Args:
         prompt: Natural language prompt
         schema_context: Database schema description
+        schema_hash: Precomputed fingerprint of schema_context, if known
         
     Returns:
         Tuple of (success: bool, sql: str, message: str)
     """
-    return ai_service.generate_sql(prompt, schema_context)
+    return get_ai_service().generate_sql(prompt, schema_context, schema_hash)
+
+
+def convert_batch_to_sql(prompts: List[str], schema_context: str,
+                         schema_hash: Optional[str] = None) -> List[Tuple[bool, str, str]]:
+    """
+    Convert several natural language prompts to SQL concurrently.
+    
+    Args:
+        prompts: List of natural language prompts
+        schema_context: Database schema description
+        schema_hash: Precomputed fingerprint of schema_context, if known
+        
+    Returns:
+        List of (success: bool, sql: str, message: str), in prompt order
+    """
+    return asyncio.run(get_ai_service().agenerate_sql_batch(prompts, schema_context, schema_hash))
 
 
 # ============================================
@@ -426,6 +1079,7 @@ Columns:
         "Get employees in the Engineering department"
     ]
     
+    ai_service = get_ai_service()
     print(f"AI Provider: {ai_service.provider.upper()}")
     print(f"OpenAI Key configured: {'Yes' if ai_service.openai_key and ai_service.openai_key != 'your_openai_api_key_here' else 'No'}")
     print(f"Gemini Key configured: {'Yes' if ai_service.gemini_key and ai_service.gemini_key != 'your_gemini_api_key_here' else 'No'}")
@@ -10,22 +10,119 @@ Author: AI Integration Project
 
 import os
 import re
-from flask import Flask, request, jsonify
+import queue
+import atexit
+import decimal
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import msgspec
+import orjson
+from typing import List
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 
-# Import custom modules
-from db import db_manager, test_db_connection, execute_sql, execute_manual_sql, get_schema_context
-from ai_service import ai_service, convert_to_sql
-
 # Load environment variables
 load_dotenv()
 
+# Configure logging once, before the custom modules log their startup state.
+# Records are handed to a queue so request threads never wait on log I/O;
+# a listener thread writes them to stderr and, if LOG_FILE is set, to a
+# rotating file.
+log_formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s')
+log_handlers = [logging.StreamHandler()]
+if os.getenv('LOG_FILE'):
+    log_handlers.append(RotatingFileHandler(os.getenv('LOG_FILE'), maxBytes=10 * 1024 * 1024, backupCount=5))
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+
+# The queue handler only merges the message arguments; the listener's
+# handlers apply the full format
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), handlers=[queue_handler])
+
+
+def _restart_log_listener() -> None:
+    """
+    Give a forked process (e.g. a worker of a preloading server) its own
+    log queue and listener thread; threads are not copied by fork, so
+    without this its records would pile up in a queue nobody reads.
+    """
+    global log_queue, log_listener
+    log_queue = queue.SimpleQueue()
+    queue_handler.queue = log_queue
+    log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+    log_listener.start()
+
+
+def _stop_log_listener() -> None:
+    """Flush and stop this process's log listener at exit."""
+    log_listener.stop()
+
+
+os.register_at_fork(after_in_child=_restart_log_listener)
+atexit.register(_stop_log_listener)
+logger = logging.getLogger("nl2sql")
+
+# Import custom modules
+from db import (
+    get_db, test_db_connection, execute_sql_batch, execute_sql_stream, execute_sql_columns,
+    execute_manual_sql, get_metrics_snapshot, get_schema_fingerprint, get_schema_hash,
+    refresh_schema_context
+)
+from ai_service import get_ai_service, convert_to_sql, convert_batch_to_sql
+
 # ============================================
 # Flask Application Setup
 # ============================================
 
-app = Flask(__name__)
+class ORJSONProvider(JSONProvider):
+    """
+    JSON provider backed by orjson.
+    Speeds up every jsonify() response and request.get_json() parse,
+    which matters for wide query results.
+    """
+    
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    @staticmethod
+    def _default(obj):
+        """Serialize types orjson does not handle natively."""
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        if hasattr(obj, '__html__'):
+            return str(obj.__html__())
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize data as a JSON string."""
+        return orjson.dumps(obj, default=self._default, option=self.OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response directly from the encoded bytes."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self._default, option=self.OPTIONS),
+            mimetype="application/json"
+        )
+
+
+class ORJSONFlask(Flask):
+    """Flask application that uses orjson for JSON encoding and decoding."""
+    json_provider_class = ORJSONProvider
+
+
+app = ORJSONFlask(__name__)
 
 # Enable CORS for all routes (allowing React frontend to connect)
 CORS(app, resources={
@@ -40,6 +137,187 @@ CORS(app, resources={
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'nl2sql_secret_key')
 app.config['JSON_SORT_KEYS'] = False
 
+# Operations blocked on the manual execution endpoint
+DANGEROUS_KEYWORDS_RE = re.compile(r'\b(DROP|TRUNCATE|GRANT|REVOKE|ALTER|CREATE)\b', re.IGNORECASE)
+
+# Maximum number of prompts accepted by /api/batch-prompt
+MAX_BATCH_PROMPTS = int(os.getenv('MAX_BATCH_PROMPTS', 10))
+
+# Rows encoded per chunk when streaming query results
+STREAM_CHUNK_ROWS = 500
+
+# Media type for newline-delimited JSON result streams
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+# ============================================
+# Streaming Helpers
+# ============================================
+
+def wants_ndjson() -> bool:
+    """
+    Check whether the client asked for newline-delimited JSON, either with
+    ?format=ndjson or by preferring application/x-ndjson in Accept.
+    """
+    if request.args.get('format') == 'ndjson':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_rows_response(sql_query, rows, count_field="row_count"):
+    """
+    Stream query results as a JSON object while rows are still being fetched.
+    The body has the same fields as the buffered responses; the row count,
+    success flag and message come after the data since they are only known
+    at the end. If the database fails mid-stream, the trailing fields carry
+    "success": false and the error instead.
+    
+    Clients that ask for NDJSON (see wants_ndjson) get one JSON document
+    per line instead: {"sql": ...}, then one line per row, then the
+    trailing fields.
+    
+    Args:
+        sql_query: SQL query that produced the rows
+        rows: RowStream from execute_sql_stream
+        count_field: Name of the trailing row count field
+        
+    Returns:
+        Flask streaming Response
+    """
+    ndjson = wants_ndjson()
+    
+    def generate():
+        row_count = 0
+        if ndjson:
+            chunk = [orjson.dumps({"sql": sql_query}), b'\n']
+        else:
+            chunk = [b'{"sql":', orjson.dumps(sql_query), b',"data":[']
+        
+        try:
+            for row in rows:
+                if ndjson:
+                    chunk.append(orjson.dumps(row, default=ORJSONProvider._default, option=orjson.OPT_APPEND_NEWLINE))
+                else:
+                    if row_count:
+                        chunk.append(b',')
+                    chunk.append(orjson.dumps(row, default=ORJSONProvider._default))
+                row_count += 1
+                if row_count % STREAM_CHUNK_ROWS == 0:
+                    yield b''.join(chunk)
+                    chunk = []
+            tail = {
+                count_field: row_count,
+                "success": True,
+                "message": f"Query executed successfully. {row_count} rows returned."
+            }
+        except Exception as e:
+            logger.error("Error streaming results: %s", e)
+            tail = {
+                count_field: row_count,
+                "success": False,
+                "error": f"Database Error: {str(e)}"
+            }
+        
+        if ndjson:
+            chunk.append(orjson.dumps(tail, option=orjson.OPT_APPEND_NEWLINE))
+        else:
+            # Close the data array and append the trailing fields
+            chunk.append(b'],')
+            chunk.append(orjson.dumps(tail)[1:])
+        yield b''.join(chunk)
+    
+    mimetype = NDJSON_MIMETYPE if ndjson else 'application/json'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.call_on_close(rows.close)
+    return response
+
+
+def columns_response(sql_query):
+    """
+    Execute a query and return its result in columnar form:
+    {"sql", "columns": [...], "data": {column: [values]}, "row_count", ...}.
+    Avoids building a dict per row, which makes large results cheaper
+    to produce and to encode. Requested with ?format=columns.
+    
+    Args:
+        sql_query: SELECT query to execute
+        
+    Returns:
+        Flask Response
+    """
+    success, result, message = execute_sql_columns(sql_query)
+    
+    if not success:
+        return jsonify({
+            "success": False,
+            "error": f"Database Error: {message}",
+            "sql": sql_query,
+            "data": None
+        }), 400
+    
+    body = {"sql": sql_query, **result, "success": True, "message": message}
+    return Response(orjson.dumps(body, default=ORJSONProvider._default), mimetype='application/json')
+
+
+# ============================================
+# Request Bodies
+# ============================================
+
+class PromptRequest(msgspec.Struct):
+    """Body of POST /api/prompt."""
+    prompt: str = ""
+
+
+class BatchPromptRequest(msgspec.Struct):
+    """Body of POST /api/batch-prompt."""
+    prompts: List[str] = msgspec.field(default_factory=list)
+
+
+class SqlRequest(msgspec.Struct):
+    """Body of POST /api/raw-query and /api/execute-manual."""
+    sql: str = ""
+
+
+def decode_body(body_type):
+    """
+    Decode and type-check the JSON request body in one pass.
+    
+    Args:
+        body_type: msgspec.Struct describing the expected body
+        
+    Returns:
+        Tuple of (body: body_type/None, error: str/None)
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None, "No JSON data provided"
+    try:
+        return msgspec.json.decode(raw, type=body_type), None
+    except msgspec.ValidationError as e:
+        return None, f"Invalid request body: {e}"
+    except msgspec.DecodeError:
+        return None, "Request body is not valid JSON"
+
+
+# ============================================
+# Request Context
+# ============================================
+
+def load_schema_context():
+    """
+    Load the cached schema context and its fingerprint for this request.
+    Stored on flask.g so the prompt cache, LLM call and logging share one
+    lookup per request. Routes call it only once the body has been
+    validated, so a bad payload never reaches the database.
+    
+    Returns:
+        Tuple of (schema_context: str, schema_hash: str/None)
+    """
+    if 'schema_ctx' not in g:
+        g.schema_ctx, g.schema_hash = get_schema_fingerprint()
+    return g.schema_ctx, g.schema_hash
+
 
 # ============================================
 # API Routes
@@ -54,8 +332,10 @@ def home():
         "description": "Convert natural language prompts to SQL queries",
         "endpoints": {
             "POST /api/prompt": "Convert natural language to SQL and execute",
+            "POST /api/batch-prompt": "Convert several prompts concurrently and execute",
             "GET /api/health": "Health check endpoint",
             "GET /api/schema": "Get database schema information",
+            "POST /api/schema/refresh": "Refresh the cached schema used as AI context",
             "GET /api/examples": "Get example prompts"
         }
     })
@@ -71,6 +351,7 @@ def health_check():
     db_connected, db_message = test_db_connection()
     
     # Check AI service configuration
+    ai_service = get_ai_service()
     ai_configured = (
         (ai_service.provider == 'openai' and ai_service.openai_key and ai_service.openai_key != 'your_openai_api_key_here') or
         (ai_service.provider == 'gemini' and ai_service.gemini_key and ai_service.gemini_key != 'your_gemini_api_key_here')
@@ -96,7 +377,7 @@ def get_schema():
     Returns table and column information.
     """
     try:
-        schema = db_manager.get_table_schema()
+        schema = get_db().get_table_schema()
         return jsonify({
             "success": True,
             "schema": schema
@@ -108,6 +389,40 @@ def get_schema():
         }), 500
 
 
+@app.route('/api/schema/refresh', methods=['POST'])
+def refresh_schema():
+    """
+    Refresh the cached schema description used as AI context.
+    Call this after changing tables so new prompts see the change
+    without waiting for the cache to expire.
+    """
+    schema_context = refresh_schema_context()
+    
+    if not schema_context or "Unable to retrieve" in schema_context:
+        return jsonify({
+            "success": False,
+            "error": "Failed to retrieve database schema. Please check database connection."
+        }), 500
+    
+    return jsonify({
+        "success": True,
+        "message": "Schema cache refreshed",
+        "schema_hash": get_schema_hash()
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Get the precomputed metrics.
+    Values are served from memory and refreshed in the background.
+    """
+    return jsonify({
+        "success": True,
+        "metrics": get_metrics_snapshot()
+    })
+
+
 @app.route('/api/examples', methods=['GET'])
 def get_examples():
     """
@@ -183,17 +498,17 @@ def process_prompt():
     """
     try:
         # Get request data
-        data = request.get_json()
+        body, body_error = decode_body(PromptRequest)
         
-        if not data:
+        if body_error:
             return jsonify({
                 "success": False,
-                "error": "No JSON data provided",
+                "error": body_error,
                 "sql": None,
                 "data": None
             }), 400
         
-        prompt = data.get('prompt', '').strip()
+        prompt = body.prompt.strip()
         
         if not prompt:
             return jsonify({
@@ -203,8 +518,19 @@ def process_prompt():
                 "data": None
             }), 400
         
+        # Reject bad prompts before touching the database or the LLM
+        prompt_ok, prompt_message = get_ai_service().check_prompt(prompt)
+        
+        if not prompt_ok:
+            return jsonify({
+                "success": False,
+                "error": prompt_message,
+                "sql": None,
+                "data": None
+            }), 400
+        
         # Step 1: Get database schema context for AI
-        schema_context = get_schema_context()
+        schema_context, schema_hash = load_schema_context()
         
         if not schema_context or "Unable to retrieve" in schema_context:
             return jsonify({
@@ -215,7 +541,8 @@ def process_prompt():
             }), 500
         
         # Step 2: Convert natural language to SQL using AI
-        ai_success, sql_query, ai_message = convert_to_sql(prompt, schema_context)
+        logger.debug("Generating SQL against schema %s", schema_hash)
+        ai_success, sql_query, ai_message = convert_to_sql(prompt, schema_context, schema_hash)
         
         if not ai_success:
             return jsonify({
@@ -226,7 +553,10 @@ def process_prompt():
             }), 400
         
         # Step 3: Execute the SQL query
-        db_success, results, db_message = execute_sql(sql_query)
+        if request.args.get('format') == 'columns':
+            return columns_response(sql_query)
+        
+        db_success, rows, db_message = execute_sql_stream(sql_query)
         
         if not db_success:
             return jsonify({
@@ -236,18 +566,12 @@ def process_prompt():
                 "data": None
             }), 400
         
-        # Step 4: Return successful response
-        return jsonify({
-            "success": True,
-            "sql": sql_query,
-            "data": results,
-            "row_count": len(results),
-            "message": f"Query executed successfully. {len(results)} rows returned."
-        })
+        # Step 4: Stream the results back as they are fetched
+        return stream_rows_response(sql_query, rows)
         
     except Exception as e:
         # Log the error
-        print(f"❌ Error processing prompt: {str(e)}")
+        logger.error("Error processing prompt: %s", e)
         
         return jsonify({
             "success": False,
@@ -257,6 +581,113 @@ def process_prompt():
         }), 500
 
 
+@app.route('/api/batch-prompt', methods=['POST'])
+def process_batch_prompt():
+    """
+    Convert several natural language prompts to SQL and execute them.
+    The LLM calls and then the queries run concurrently, so the batch takes
+    roughly as long as the slowest prompt instead of the sum of all of them.
+    
+    Request Body:
+        {
+            "prompts": ["Show all employees", "Count employees in each department"]
+        }
+    
+    Response:
+        {
+            "success": true,
+            "results": [
+                {"prompt": ..., "success": ..., "sql": ..., "data": [...], "row_count": ..., "message"/"error": ...}
+            ]
+        }
+    """
+    try:
+        body, body_error = decode_body(BatchPromptRequest)
+        
+        if body_error:
+            return jsonify({
+                "success": False,
+                "error": body_error
+            }), 400
+        
+        prompts = body.prompts
+        
+        if not prompts:
+            return jsonify({
+                "success": False,
+                "error": "No prompts provided. Send a non-empty 'prompts' list."
+            }), 400
+        
+        if len(prompts) > MAX_BATCH_PROMPTS:
+            return jsonify({
+                "success": False,
+                "error": f"Too many prompts. At most {MAX_BATCH_PROMPTS} are allowed per batch."
+            }), 400
+        
+        prompts = [p.strip() for p in prompts]
+        
+        # Step 1: Get database schema context for AI
+        schema_context, schema_hash = load_schema_context()
+        
+        if not schema_context or "Unable to retrieve" in schema_context:
+            return jsonify({
+                "success": False,
+                "error": "Failed to retrieve database schema. Please check database connection."
+            }), 500
+        
+        # Step 2: Convert all prompts to SQL concurrently
+        generated = convert_batch_to_sql(prompts, schema_context, schema_hash)
+        
+        # Step 3: Execute the generated queries concurrently
+        executed = iter(execute_sql_batch([sql for ok, sql, _ in generated if ok]))
+        
+        results = []
+        for prompt, (ai_success, sql_query, ai_message) in zip(prompts, generated):
+            if not ai_success:
+                results.append({
+                    "prompt": prompt,
+                    "success": False,
+                    "error": f"AI Error: {ai_message}",
+                    "sql": sql_query if sql_query else None,
+                    "data": None
+                })
+                continue
+            
+            db_success, rows, db_message = next(executed)
+            
+            if not db_success:
+                results.append({
+                    "prompt": prompt,
+                    "success": False,
+                    "error": f"Database Error: {db_message}",
+                    "sql": sql_query,
+                    "data": None
+                })
+                continue
+            
+            results.append({
+                "prompt": prompt,
+                "success": True,
+                "sql": sql_query,
+                "data": rows,
+                "row_count": len(rows),
+                "message": f"Query executed successfully. {len(rows)} rows returned."
+            })
+        
+        return jsonify({
+            "success": True,
+            "results": results
+        })
+        
+    except Exception as e:
+        logger.error("Error processing batch prompt: %s", e)
+        
+        return jsonify({
+            "success": False,
+            "error": f"Server error: {str(e)}"
+        }), 500
+
+
 @app.route('/api/raw-query', methods=['POST'])
 def execute_raw_query():
     """
@@ -269,18 +700,24 @@ def execute_raw_query():
         }
     """
     try:
-        data = request.get_json()
+        body, body_error = decode_body(SqlRequest)
+        
+        if body_error:
+            return jsonify({
+                "success": False,
+                "error": body_error
+            }), 400
         
-        if not data or not data.get('sql'):
+        if not body.sql:
             return jsonify({
                 "success": False,
                 "error": "No SQL query provided"
             }), 400
         
-        sql_query = data.get('sql', '').strip()
+        sql_query = body.sql.strip()
         
         # Validate the query (using AI service's validation)
-        is_valid, validation_message = ai_service.validate_sql(sql_query)
+        is_valid, validation_message = get_ai_service().validate_sql(sql_query)
         
         if not is_valid:
             return jsonify({
@@ -290,7 +727,10 @@ def execute_raw_query():
             }), 400
         
         # Execute the query
-        success, results, message = execute_sql(sql_query)
+        if request.args.get('format') == 'columns':
+            return columns_response(sql_query)
+        
+        success, rows, message = execute_sql_stream(sql_query)
         
         if not success:
             return jsonify({
@@ -299,12 +739,7 @@ def execute_raw_query():
                 "sql": sql_query
             }), 400
         
-        return jsonify({
-            "success": True,
-            "sql": sql_query,
-            "data": results,
-            "row_count": len(results)
-        })
+        return stream_rows_response(sql_query, rows)
         
     except Exception as e:
         return jsonify({
@@ -325,15 +760,21 @@ def execute_manual_query():
         }
     """
     try:
-        data = request.get_json()
+        body, body_error = decode_body(SqlRequest)
+        
+        if body_error:
+            return jsonify({
+                "success": False,
+                "error": body_error
+            }), 400
         
-        if not data or not data.get('sql'):
+        if not body.sql:
             return jsonify({
                 "success": False,
                 "error": "No SQL query provided"
             }), 400
         
-        sql_query = data.get('sql', '').strip()
+        sql_query = body.sql.strip()
         
         if not sql_query:
             return jsonify({
@@ -342,16 +783,14 @@ def execute_manual_query():
             }), 400
         
         # Basic security checks (prevent dangerous operations)
-        dangerous_keywords = ['DROP', 'TRUNCATE', 'GRANT', 'REVOKE', 'ALTER', 'CREATE']
-        sql_upper = sql_query.upper()
+        dangerous_match = DANGEROUS_KEYWORDS_RE.search(sql_query)
         
-        for keyword in dangerous_keywords:
-            if re.search(r'\b' + keyword + r'\b', sql_upper):
-                return jsonify({
-                    "success": False,
-                    "error": f"Dangerous operation detected: {keyword}. Only SELECT, INSERT, UPDATE, DELETE are allowed.",
-                    "sql": sql_query
-                }), 400
+        if dangerous_match:
+            return jsonify({
+                "success": False,
+                "error": f"Dangerous operation detected: {dangerous_match.group(1).upper()}. Only SELECT, INSERT, UPDATE, DELETE are allowed.",
+                "sql": sql_query
+            }), 400
         
         # Check for multiple statements
         if sql_query.count(';') > 1:
@@ -361,6 +800,19 @@ def execute_manual_query():
                 "sql": sql_query
             }), 400
         
+        # SELECT results are streamed like the other query endpoints
+        if sql_query.split(None, 1)[0].upper() == 'SELECT':
+            success, rows, message = execute_sql_stream(sql_query)
+            
+            if not success:
+                return jsonify({
+                    "success": False,
+                    "error": message,
+                    "sql": sql_query
+                }), 400
+            
+            return stream_rows_response(sql_query, rows, count_field="affected_rows")
+        
         # Execute the query using the manual execution function
         success, results, message = execute_manual_sql(sql_query)
         
@@ -422,34 +874,52 @@ def internal_error(error):
 # ============================================
 
 if __name__ == '__main__':
-    print("=" * 60)
-    print("🚀 Natural Language to SQL API Server")
-    print("=" * 60)
+    if os.getenv('FLASK_DEBUG', 'True').lower() != 'true':
+        # Hand the process over to gunicorn for concurrent production serving.
+        # Exec before any startup checks, so no pool or background threads
+        # are created only to be thrown away; gunicorn's workers set up
+        # their own on first use.
+        backend_dir = os.path.dirname(os.path.abspath(__file__))
+        os.execvp('gunicorn', [
+            'gunicorn',
+            '--chdir', backend_dir,
+            '-c', os.path.join(backend_dir, 'gunicorn.conf.py'),
+            'app:app'
+        ])
+    
+    logger.info("Natural Language to SQL API Server")
     
     # Test database connection on startup
     db_connected, db_message = test_db_connection()
-    print(f"📊 Database: {'✅ Connected' if db_connected else '❌ Not Connected'}")
-    if not db_connected:
-        print(f"   Message: {db_message}")
+    if db_connected:
+        logger.info("Database: connected")
+    else:
+        logger.error("Database: not connected (%s)", db_message)
     
     # Check AI configuration
+    ai_service = get_ai_service()
     ai_configured = (
         (ai_service.provider == 'openai' and ai_service.openai_key and ai_service.openai_key != 'your_openai_api_key_here') or
         (ai_service.provider == 'gemini' and ai_service.gemini_key and ai_service.gemini_key != 'your_gemini_api_key_here')
     )
-    print(f"🤖 AI Service: {ai_service.provider.upper()} {'✅ Configured' if ai_configured else '⚠️ Not Configured'}")
+    if ai_configured:
+        logger.info("AI Service: %s configured", ai_service.provider.upper())
+    else:
+        logger.warning("AI Service: %s not configured", ai_service.provider.upper())
     
-    print("=" * 60)
-    print("📡 API Endpoints:")
-    print("   POST /api/prompt    - Convert NL to SQL and execute")
-    print("   GET  /api/health    - Health check")
-    print("   GET  /api/schema    - Get database schema")
-    print("   GET  /api/examples  - Get example prompts")
-    print("=" * 60)
+    logger.info(
+        "API Endpoints:\n"
+        "   POST /api/prompt    - Convert NL to SQL and execute\n"
+        "   POST /api/batch-prompt - Convert several prompts concurrently\n"
+        "   GET  /api/health    - Health check\n"
+        "   GET  /api/schema    - Get database schema\n"
+        "   POST /api/schema/refresh - Refresh cached schema context\n"
+        "   GET  /api/examples  - Get example prompts"
+    )
     
-    # Run the Flask development server
+    # Run the Flask development server (single process, auto-reload)
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+        debug=True
     )
@@ -5,18 +5,499 @@ Database Connection and Operations Module
 This module handles all database connections and query execution
 for the Natural Language to SQL application.
 
+Pool sizing: every app worker process opens up to DB_POOL_SIZE
+connections (plus DB_ASYNC_POOL_MAX for batch requests), so
+workers x pool size must stay below the MySQL server's
+max_connections (151 by default). Raise max_connections or lower the
+pool size when running several gunicorn workers.
+
 Author: AI Integration Project
 """
 
+import io
 import os
+import re
+import time
+import asyncio
+import hashlib
+import json
+import datetime
+import logging
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, OrderedDict
+from functools import partial, lru_cache
+from decimal import Decimal
+from cachetools import TTLCache, LRUCache
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error, PoolError, pooling
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+# Optional C driver, selected with DB_DRIVER=mysqlclient
+try:
+    import MySQLdb
+    import MySQLdb.cursors
+    from dbutils.pooled_db import PooledDB
+except ImportError:
+    MySQLdb = None
+    PooledDB = None
+
+# Optional async driver for aexecute_query
+try:
+    import asyncmy
+    from asyncmy.cursors import DictCursor as AsyncDictCursor
+    from asyncmy.errors import Error as AsyncError
+except ImportError:
+    asyncmy = None
+
+# Optional SQL parser used to turn recurring queries into prepared statements
+try:
+    import sqlglot
+    from sqlglot import exp
+except ImportError:
+    sqlglot = None
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("nl2sql.db")
+
+if not mysql.connector.HAVE_CEXT:
+    warnings.warn(
+        "mysql-connector's C extension is not available; falling back to the "
+        "much slower pure-Python protocol implementation",
+        RuntimeWarning
+    )
+
+# Exceptions raised by whichever driver is in use
+DB_ERRORS = (Error, MySQLdb.Error) if MySQLdb else (Error,)
+if asyncmy:
+    DB_ERRORS += (AsyncError,)
+
+
+# Whitespace runs outside quoted literals, used to normalize query cache keys
+_QUERY_WHITESPACE_RE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|\s+")
+
+@lru_cache(maxsize=1024)
+def _split_literals(query: str) -> Optional[Tuple[str, tuple]]:
+    """
+    Turn the literals in a query's WHERE/HAVING clauses into placeholders,
+    so queries that differ only in filter values share one template.
+    Literals under ORDER BY, GROUP BY, LIMIT and INTERVAL, inside function
+    calls (CAST, CASE, ...) and in data types such as DECIMAL(10,2) are
+    left alone, since a placeholder there would change the meaning or
+    cannot be prepared.
+    
+    Args:
+        query: SQL SELECT query
+        
+    Returns:
+        Tuple of (template, params), or None if nothing could be lifted
+    """
+    try:
+        expression = sqlglot.parse_one(query, read='mysql')
+    except sqlglot.errors.ParseError:
+        return None
+    
+    params = []
+    
+    def liftable(node):
+        # AND/OR are Func subclasses in sqlglot, but a literal under them is fine
+        parent = node.parent
+        while parent is not None and not isinstance(parent, (exp.Where, exp.Having)):
+            if (isinstance(parent, (exp.Order, exp.Group, exp.Limit, exp.Offset, exp.Interval,
+                                    exp.DataType, exp.DataTypeParam))
+                    or isinstance(parent, exp.Func) and not isinstance(parent, exp.Connector)):
+                return False
+            parent = parent.parent
+        return parent is not None
+    
+    def lift(node):
+        if isinstance(node, exp.Literal) and liftable(node):
+            if node.is_string:
+                params.append(node.this)
+            else:
+                params.append(int(node.this) if node.is_int else Decimal(node.this))
+            return exp.Placeholder()
+        return node
+    
+    template = expression.transform(lift).sql(dialect='mysql')
+    # The driver rewrites %s to ?, which would corrupt a literal '%s'
+    if not params or '%s' in template:
+        return None
+    return template, tuple(params)
+
+
+# Converters for column values that are not JSON-serializable as-is,
+# looked up by exact type so each cell costs one dict lookup
+_JSON_CONVERTERS = {
+    Decimal: float,
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    datetime.timedelta: str,
+}
+
+
+# Markers appended to key columns in the schema description
+_KEY_MARKERS = {'PRI': " [PRIMARY KEY]", 'MUL': " [FOREIGN KEY]"}
+
+# Converters applied per column in columnar results, keyed by MySQL
+# field type code (DECIMAL, NEWDECIMAL, TIME). orjson encodes the
+# other types, dates included, natively.
+_COLUMN_CONVERTERS = {
+    0: float,
+    246: float,
+    11: str,
+}
+
+
+def _serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert Decimal and datetime values in a result row to JSON-serializable formats.
+    
+    Args:
+        row: Row returned by a dictionary cursor
+        
+    Returns:
+        Row with JSON-serializable values
+    """
+    get_converter = _JSON_CONVERTERS.get
+    serializable_row = {}
+    for key, value in row.items():
+        converter = get_converter(type(value))
+        serializable_row[key] = converter(value) if converter else value
+    return serializable_row
+
+
+# Source for the conversion of one cell, keyed by MySQL field type code.
+# Each conversion checks the value's exact type first, so NULLs and values
+# a driver returns in another form (e.g. mysqlclient's zero dates, which
+# come back as str) pass through unchanged, as they do in _serialize_row.
+_CELL_TEMPLATES = {
+    0: "float({v}) if ({v} := r[{key}]).__class__ is _Decimal else {v}",
+    246: "float({v}) if ({v} := r[{key}]).__class__ is _Decimal else {v}",
+    7: "{v}.isoformat() if ({v} := r[{key}]).__class__ in _DATE_TYPES else {v}",
+    10: "{v}.isoformat() if ({v} := r[{key}]).__class__ in _DATE_TYPES else {v}",
+    12: "{v}.isoformat() if ({v} := r[{key}]).__class__ in _DATE_TYPES else {v}",
+    11: "str({v}) if ({v} := r[{key}]).__class__ is _timedelta else {v}",
+}
+
+# Names the generated code refers to
+_ROWGEN_NAMESPACE = {
+    '_Decimal': Decimal,
+    '_DATE_TYPES': frozenset((datetime.datetime, datetime.date)),
+    '_timedelta': datetime.timedelta,
+}
+
+
+@lru_cache(maxsize=256)
+def _build_row_serializer(columns: Tuple[Tuple[str, int], ...]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Generate a row serializer specialized to one result shape.
+    The generated function builds the output dict in a single expression
+    and only converts the columns whose type needs it, so there is no
+    per-cell dict lookup or loop at run time. Column names must be unique
+    (see _row_serializer).
+    
+    Args:
+        columns: (name, type code) of each column, from cursor.description
+        
+    Returns:
+        Function converting a dictionary-cursor row to a JSON-serializable dict
+    """
+    items = []
+    for i, (name, type_code) in enumerate(columns):
+        key = repr(name)
+        template = _CELL_TEMPLATES.get(type_code)
+        if template is None:
+            items.append(f"{key}: r[{key}]")
+        else:
+            items.append(f"{key}: " + template.format(v=f"v{i}", key=key))
+    src = "def row(r):\n    return {" + ", ".join(items) + "}\n"
+    namespace = dict(_ROWGEN_NAMESPACE)
+    exec(compile(src, "<rowgen>", "exec"), namespace)
+    return namespace['row']
+
+
+def _row_serializer(cursor) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Get the specialized row serializer for a cursor's current result.
+    Falls back to _serialize_row when the cursor has no description or
+    repeats a column name: drivers disagree on how a dictionary row keys a
+    repeated name (mysql-connector keeps the last column, mysqlclient and
+    asyncmy add "table.column"), so only the row itself has the real keys.
+    
+    Args:
+        cursor: Dictionary cursor with an executed query
+        
+    Returns:
+        Function converting a row to a JSON-serializable dict
+    """
+    description = cursor.description
+    if not description:
+        return _serialize_row
+    columns = tuple((col[0], col[1]) for col in description)
+    if len({name for name, _ in columns}) != len(columns):
+        return _serialize_row
+    return _build_row_serializer(columns)
+
+
+class CachedRows:
+    """
+    Iterator over rows that are already in memory, e.g. served from the
+    query cache. Has the same interface as RowStream so callers need not
+    care how a result was produced.
+    """
+    
+    def __init__(self, rows: List[Dict[str, Any]]):
+        """
+        Args:
+            rows: Already serialized rows
+        """
+        self._rows = iter(rows)
+    
+    def __iter__(self) -> 'CachedRows':
+        return self
+    
+    def __next__(self) -> Dict[str, Any]:
+        return next(self._rows)
+    
+    def close(self) -> None:
+        """Nothing to release; present for RowStream compatibility."""
+
+
+# Rows pulled from the server per fetchmany() call when streaming
+FETCH_BATCH_SIZE = int(os.getenv('FETCH_BATCH_SIZE', 1000))
+
+
+class RowStream:
+    """
+    Iterator over the rows of an executed query.
+    Rows are read from the server in batches of FETCH_BATCH_SIZE, so memory
+    stays bounded by the batch rather than the result set.
+    Holds the connection until the rows are exhausted or close() is called,
+    so callers must close it if they stop early.
+    """
+    
+    def __init__(self, connection, cursor, batch_size: int = FETCH_BATCH_SIZE,
+                 on_complete: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 collect_limit: int = 0, keep_cursor: bool = False):
+        """
+        Args:
+            connection: Connection the cursor belongs to
+            cursor: Unbuffered cursor with a pending result set
+            batch_size: Number of rows fetched per round
+            on_complete: Called with all rows once the result is fully read,
+                unless it had more than collect_limit rows
+            collect_limit: Maximum rows kept for on_complete
+            keep_cursor: Leave the cursor open on close (cached prepared
+                cursors), only discarding rows left unread
+        """
+        self._connection = connection
+        self._cursor = cursor
+        self._batch_size = batch_size
+        self._on_complete = on_complete
+        self._collect_limit = collect_limit
+        self._keep_cursor = keep_cursor
+        self._exhausted = False
+        self._rows = self._iter_rows()
+    
+    def _iter_rows(self):
+        """Yield serialized rows, one fetchmany() batch at a time."""
+        collected = [] if self._on_complete else None
+        serialize = _row_serializer(self._cursor)
+        while True:
+            batch = self._cursor.fetchmany(self._batch_size)
+            if not batch:
+                break
+            rows = list(map(serialize, batch))
+            if collected is not None:
+                collected.extend(rows)
+                if len(collected) > self._collect_limit:
+                    collected = None
+            yield from rows
+        self._exhausted = True
+        if collected is not None:
+            self._on_complete(collected)
+    
+    def __iter__(self) -> 'RowStream':
+        return self
+    
+    def __next__(self) -> Dict[str, Any]:
+        if self._cursor is None:
+            raise StopIteration
+        try:
+            return next(self._rows)
+        except StopIteration:
+            self.close()
+            raise
+        except DB_ERRORS:
+            self.close()
+            raise
+    
+    def close(self) -> None:
+        """Release the cursor and return the connection to the pool."""
+        if self._cursor is None:
+            return
+        cursor, connection = self._cursor, self._connection
+        self._cursor = self._connection = None
+        try:
+            if self._keep_cursor:
+                # Resetting the statement discards its unread rows but keeps
+                # it prepared for the next execution
+                if not self._exhausted:
+                    cursor.reset()
+            else:
+                # Drain rows left unread if the consumer stopped early
+                # (mysqlclient does this itself when the cursor is closed)
+                consume_results = getattr(connection, 'consume_results', None)
+                if consume_results:
+                    consume_results()
+                cursor.close()
+        except DB_ERRORS as e:
+            logger.error("Error closing result stream: %s", e)
+        finally:
+            connection.close()
+
+
+class MetricRegistry:
+    """
+    Precomputed results of registered aggregate queries ("total
+    employees", "payroll by department", ...). Each metric is refreshed
+    in the background every ttl seconds, and a query whose text matches a
+    registered metric is answered from memory instead of MySQL.
+    Metrics can be registered in code or listed in a JSON file named by
+    METRICS_FILE: {"name": "SELECT ...", "name2": {"sql": "...", "ttl": 600}}.
+    """
+    
+    def __init__(self, manager: 'DatabaseManager'):
+        """
+        Args:
+            manager: DatabaseManager used to run the metric queries
+        """
+        self._manager = manager
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[bytes, str] = {}
+    
+    def register_metric(self, name: str, sql: str, ttl: float = 300, refresh: bool = True) -> None:
+        """
+        Register a metric and schedule its first refresh.
+        
+        Args:
+            name: Metric name
+            sql: SELECT query computing the metric
+            ttl: Seconds between refreshes
+            refresh: Compute the metric right away (in the background)
+        """
+        key = self._manager._query_cache_key(sql)
+        if key is None:
+            raise ValueError(f"Metric '{name}' must be a SELECT query")
+        
+        with self._lock:
+            self._metrics[name] = {'sql': sql.strip(), 'ttl': ttl, 'key': key, 'rows': None}
+            self._by_key[key] = name
+        if refresh:
+            self._schedule([name], 0)
+        self._manager.invalidate_schema_description()
+    
+    def load_file(self, path: str) -> None:
+        """
+        Register the metrics listed in a JSON file.
+        They are first computed together in a single round trip.
+        
+        Args:
+            path: Path to the metrics file
+        """
+        with open(path, 'rb') as f:
+            definitions = json.load(f)
+        for name, definition in definitions.items():
+            if isinstance(definition, str):
+                definition = {'sql': definition}
+            self.register_metric(name, definition['sql'], definition.get('ttl', 300), refresh=False)
+        if definitions:
+            self._schedule(list(definitions), 0)
+    
+    def _schedule(self, names: List[str], delay: float) -> None:
+        """Refresh metrics after delay seconds on a daemon timer."""
+        timer = threading.Timer(delay, self._refresh, args=(names,))
+        timer.daemon = True
+        timer.start()
+    
+    def _refresh(self, names: List[str]) -> None:
+        """Recompute metrics in one batch and schedule each one's next refresh."""
+        with self._lock:
+            metrics = [(name, self._metrics[name]) for name in names if name in self._metrics]
+        if not metrics:
+            return
+        
+        success, results, message = self._manager.execute_batch([m['sql'] for _, m in metrics])
+        if success:
+            now = time.time()
+            with self._lock:
+                for (_, metric), rows in zip(metrics, results):
+                    metric['rows'] = rows
+                    metric['ts'] = now
+        else:
+            logger.error("Error refreshing metrics %s: %s", ', '.join(names), message)
+        for name, metric in metrics:
+            self._schedule([name], metric['ttl'])
+    
+    def lookup(self, key: Optional[bytes]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the precomputed rows of the metric with this query-cache key.
+        
+        Args:
+            key: Key from DatabaseManager._query_cache_key
+            
+        Returns:
+            Metric rows, or None if no computed metric matches
+        """
+        if key is None or not self._by_key:
+            return None
+        with self._lock:
+            name = self._by_key.get(key)
+            return self._metrics[name]['rows'] if name else None
+    
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current value of every computed metric.
+        Single-value results are unwrapped to the value itself.
+        
+        Returns:
+            Dictionary of metric name to value or rows
+        """
+        snapshot = {}
+        with self._lock:
+            for name, metric in self._metrics.items():
+                rows = metric['rows']
+                if rows is None:
+                    continue
+                if len(rows) == 1 and len(rows[0]) == 1:
+                    snapshot[name] = next(iter(rows[0].values()))
+                else:
+                    snapshot[name] = rows
+        return snapshot
+    
+    def describe(self) -> str:
+        """
+        Describe the registered metrics for the AI model, so it can answer
+        matching questions with the exact SQL that is served from memory.
+        
+        Returns:
+            Text to append to the schema description, or "" if none are registered
+        """
+        with self._lock:
+            if not self._metrics:
+                return ""
+            lines = ["\n\nPrecomputed metrics (use this exact SQL when a question asks for one):"]
+            for name, metric in self._metrics.items():
+                lines.append(f"  - {name}: {metric['sql']}")
+        return "\n".join(lines)
+
 
 class DatabaseManager:
     """
@@ -26,6 +507,17 @@ class DatabaseManager:
     
     def __init__(self):
         """Initialize database configuration from environment variables."""
+        # Seconds the server waits on a slow reader of a streamed result
+        self.net_write_timeout = int(os.getenv('DB_NET_WRITE_TIMEOUT', 600))
+        # Longest GROUP_CONCAT() value before MySQL truncates it (default 1024)
+        self.group_concat_max_len = int(os.getenv('DB_GROUP_CONCAT_MAX_LEN', 1048576))
+        # Run by every new connection (and again on reconnect); see _checkout
+        # for pools that reset the session
+        self._session_init = (
+            f"SET SESSION net_write_timeout = {self.net_write_timeout}, "
+            f"group_concat_max_len = {self.group_concat_max_len}"
+        )
+        
         self.config = {
             'host': os.getenv('DB_HOST', 'localhost'),
             'port': int(os.getenv('DB_PORT', 3306)),
@@ -35,24 +527,233 @@ class DatabaseManager:
             'charset': 'utf8mb4',
             'collation': 'utf8mb4_unicode_ci',
             'autocommit': True,
-            'get_warnings': True,
-            'raise_on_warnings': False
+            # Fetching warnings costs a SHOW WARNINGS round trip per statement
+            'get_warnings': False,
+            'raise_on_warnings': False,
+            # Parse packets in the C extension rather than in Python
+            'use_pure': False,
+            'connection_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+            'init_command': self._session_init
         }
         
+        # Pool sizing; mysql-connector caps a pool at CNX_POOL_MAXSIZE (32)
+        self.pool_size = int(os.getenv('DB_POOL_SIZE', 20))
+        self.pool_min = min(int(os.getenv('DB_POOL_MIN', 2)), self.pool_size)
+        # Seconds a request waits for a free pooled connection
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', 5))
+        # Resetting the session on every return to the pool costs a round
+        # trip and undoes init_command; queries run with autocommit and keep
+        # no session state, so it is off unless asked for
+        self.pool_reset_session = os.getenv('DB_POOL_RESET_SESSION', 'False').lower() == 'true'
+        
+        # Driver: mysql-connector (default) or mysqlclient (libmysqlclient C binding)
+        self.driver = os.getenv('DB_DRIVER', 'mysql-connector').lower()
+        if self.driver == 'mysqlclient' and MySQLdb is None:
+            logger.warning("DB_DRIVER=mysqlclient but mysqlclient/DBUtils are not installed, using mysql-connector")
+            self.driver = 'mysql-connector'
+        
         # Create connection pool for better performance
         try:
-            self.pool = mysql.connector.pooling.MySQLConnectionPool(
-                pool_name="nl2sql_pool",
-                pool_size=5,
-                pool_reset_session=True,
-                **self.config
-            )
-            print("✅ Database connection pool created successfully")
-        except Error as e:
-            print(f"❌ Error creating connection pool: {e}")
+            self.pool = self._create_pool()
+            logger.info("Database connection pool created (%s, size %d)", self.driver, self.pool_size)
+        except DB_ERRORS as e:
+            logger.error("Error creating connection pool: %s", e)
             self.pool = None
+        
+        # Results of recent SELECT queries; off unless QUERY_CACHE_TTL > 0.
+        # The cache is per process, so writes made through another worker
+        # only become visible here once the entry expires.
+        self.query_cache_ttl = float(os.getenv('QUERY_CACHE_TTL', 0))
+        self.query_cache_max_rows = int(os.getenv('QUERY_CACHE_MAX_ROWS', 10000))
+        self._query_cache = TTLCache(
+            maxsize=int(os.getenv('QUERY_CACHE_SIZE', 1024)),
+            ttl=max(self.query_cache_ttl, 1)
+        )
+        self._query_cache_lock = threading.Lock()
+        
+        # Server-side prepared statements for recurring query templates.
+        # Resetting a pooled session deallocates its statements, so this
+        # only works with DB_POOL_RESET_SESSION=False (and mysql-connector).
+        self.prepare_cache_size = int(os.getenv('DB_PREPARE_CACHE_SIZE', 256))
+        if self.pool_reset_session or self.driver != 'mysql-connector' or sqlglot is None:
+            self.prepare_cache_size = 0
+        self.prepare_min_uses = int(os.getenv('DB_PREPARE_MIN_USES', 2))
+        self._template_uses = LRUCache(maxsize=max(self.prepare_cache_size * 4, 1))
+        self._template_uses_lock = threading.Lock()
+        # Templates MySQL refused to prepare or run; they are not tried again
+        self._unpreparable = LRUCache(maxsize=max(self.prepare_cache_size * 4, 1))
+        
+        # Workers for execute_query_parallel. Half the pool, so fanned-out
+        # queries cannot starve other requests.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.pool_size // 2),
+            thread_name_prefix='nl2sql-db'
+        )
+        
+        # Async pool, owned by one long-lived event loop thread so every
+        # request reuses its connections; both are created on first use
+        self.async_pool_size = int(os.getenv('DB_ASYNC_POOL_MAX', 20))
+        self._aloop: Optional[asyncio.AbstractEventLoop] = None
+        self._aloop_lock = threading.Lock()
+        self._apool_task: Optional[asyncio.Task] = None
+        
+        # Schema metadata changes rarely, so cache it instead of
+        # re-querying the catalog for every prompt
+        self._schema_ttl = float(os.getenv('SCHEMA_TTL', 300))
+        self._schema_lock = threading.RLock()
+        self._schema_cache: Optional[Dict[str, List[Dict[str, str]]]] = None
+        self._schema_cache_ts = 0.0
+        self._schema_description: Optional[str] = None
+        self._schema_hash: Optional[str] = None
+        
+        # Precomputed aggregate queries
+        self.metrics = MetricRegistry(self)
+        metrics_file = os.getenv('METRICS_FILE')
+        if metrics_file:
+            try:
+                self.metrics.load_file(metrics_file)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Error loading metrics from %s: %s", metrics_file, e)
+        
+        # Keep idle pooled connections alive so they are not dropped by the
+        # server's wait_timeout and reconnected in the middle of a request.
+        # The pool itself is already warm: mysql-connector opens every
+        # connection up front and PooledDB opens DB_POOL_MIN of them.
+        self.keepalive_interval = float(os.getenv('DB_KEEPALIVE_INTERVAL', 60))
+        self._keepalive_stop = threading.Event()
+        if self.pool is not None and self.keepalive_interval > 0:
+            threading.Thread(target=self._keepalive, name='nl2sql-db-keepalive', daemon=True).start()
+    
+    def _driver_config(self) -> Dict[str, Any]:
+        """Translate the connection config to the arguments mysqlclient and asyncmy take."""
+        return {
+            'host': self.config['host'],
+            'port': self.config['port'],
+            'database': self.config['database'],
+            'user': self.config['user'],
+            'password': self.config['password'],
+            'charset': self.config['charset'],
+            'autocommit': self.config['autocommit'],
+            'connect_timeout': self.config['connection_timeout'],
+            'init_command': self.config['init_command']
+        }
+    
+    def _create_pool(self):
+        """
+        Create the connection pool for the selected driver.
+        mysqlclient has no built-in pool, so DBUtils' PooledDB is used for it.
+        
+        Returns:
+            MySQLConnectionPool or PooledDB
+        """
+        if self.driver == 'mysqlclient':
+            return PooledDB(
+                creator=MySQLdb,
+                mincached=self.pool_min,
+                maxconnections=self.pool_size,
+                blocking=True,
+                ping=1,
+                **self._driver_config()
+            )
+        if self.pool_size > pooling.CNX_POOL_MAXSIZE:
+            logger.warning("DB_POOL_SIZE=%d exceeds mysql-connector's limit, using %d",
+                           self.pool_size, pooling.CNX_POOL_MAXSIZE)
+            self.pool_size = pooling.CNX_POOL_MAXSIZE
+        return mysql.connector.pooling.MySQLConnectionPool(
+            pool_name="nl2sql_pool",
+            pool_size=self.pool_size,
+            pool_reset_session=self.pool_reset_session,
+            **self.config
+        )
+    
+    def _connect(self):
+        """
+        Open a new connection with the selected driver, bypassing the pool.
+        
+        Returns:
+            MySQL connection object
+        """
+        if self.driver == 'mysqlclient':
+            return MySQLdb.connect(**self._driver_config())
+        return mysql.connector.connect(**self.config)
     
-    def get_connection(self) -> Optional[mysql.connector.MySQLConnection]:
+    def _cursor(self, connection, stream: bool = False):
+        """
+        Open a cursor that returns rows as dictionaries.
+        
+        Args:
+            connection: Connection from get_connection()
+            stream: Read rows from the server as they are fetched instead of buffering
+            
+        Returns:
+            Dictionary cursor for the selected driver
+        """
+        if self.driver == 'mysqlclient':
+            cursor_class = MySQLdb.cursors.SSDictCursor if stream else MySQLdb.cursors.DictCursor
+            return connection.cursor(cursor_class)
+        return connection.cursor(dictionary=True, buffered=not stream)
+    
+    def _checkout(self):
+        """
+        Take a connection from the pool, or open one if there is no pool.
+        mysql-connector's pool fails at once when every connection is in use,
+        so it is polled for up to DB_POOL_TIMEOUT seconds instead.
+        
+        Returns:
+            MySQL connection object
+            
+        Raises:
+            Driver error if no connection is available
+        """
+        if self.pool is None:
+            # Fallback to direct connection
+            return self._connect()
+        if self.driver == 'mysqlclient':
+            return self.pool.connection()
+        deadline = time.monotonic() + self.pool_timeout
+        delay = 0.005
+        while True:
+            try:
+                connection = self.pool.get_connection()
+                break
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+        if self.pool_reset_session:
+            # Returning a connection to the pool reset its session, which
+            # undid init_command, so apply the settings again
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(self._session_init)
+            except DB_ERRORS:
+                connection.close()
+                raise
+        return connection
+    
+    def _keepalive(self) -> None:
+        """
+        Background loop that runs SELECT 1 on pooled connections every
+        DB_KEEPALIVE_INTERVAL seconds. Connections are taken one at a time
+        so requests are never starved; a busy or unreachable pool is simply
+        retried on the next round.
+        """
+        while not self._keepalive_stop.wait(self.keepalive_interval):
+            for _ in range(self.pool_size):
+                try:
+                    connection = self._checkout()
+                except DB_ERRORS:
+                    break
+                try:
+                    with connection, connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                        cursor.fetchall()
+                except DB_ERRORS as e:
+                    logger.warning("Keepalive failed: %s", e)
+                    break
+    
+    def get_connection(self):
         """
         Get a connection from the pool.
         
@@ -60,13 +761,9 @@ class DatabaseManager:
             MySQL connection object or None if failed
         """
         try:
-            if self.pool:
-                return self.pool.get_connection()
-            else:
-                # Fallback to direct connection
-                return mysql.connector.connect(**self.config)
-        except Error as e:
-            print(f"❌ Error getting connection: {e}")
+            return self._checkout()
+        except DB_ERRORS as e:
+            logger.error("Error getting connection: %s", e)
             return None
     
     def test_connection(self) -> Tuple[bool, str]:
@@ -76,161 +773,669 @@ class DatabaseManager:
         Returns:
             Tuple of (success: bool, message: str)
         """
-        connection = None
+        connection = self.get_connection()
+        if connection is None:
+            return False, "Failed to establish connection"
+        
         try:
-            connection = self.get_connection()
-            if connection and connection.is_connected():
+            with connection, connection.cursor() as cursor:
                 db_info = connection.get_server_info()
-                cursor = connection.cursor()
                 cursor.execute("SELECT DATABASE();")
                 db_name = cursor.fetchone()[0]
-                cursor.close()
-                return True, f"Connected to MySQL Server version {db_info}, Database: {db_name}"
-            return False, "Failed to establish connection"
-        except Error as e:
+            return True, f"Connected to MySQL Server version {db_info}, Database: {db_name}"
+        except DB_ERRORS as e:
             return False, f"Connection error: {str(e)}"
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
     
-    def execute_query(self, query: str) -> Tuple[bool, Any, str]:
+    @staticmethod
+    def _query_cache_key(query: str) -> Optional[bytes]:
+        """
+        Build the result-cache key for a query.
+        Whitespace outside string literals is collapsed and a trailing
+        semicolon dropped; case is kept since it can matter inside
+        literals and identifiers.
+        
+        Args:
+            query: SQL query
+            
+        Returns:
+            blake2b digest, or None if the query is not a cacheable SELECT
+        """
+        query = query.strip().rstrip(';').rstrip()
+        if query[:6].upper() != 'SELECT':
+            return None
+        normalized = _QUERY_WHITESPACE_RE.sub(lambda m: m.group(1) or ' ', query)
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+    
+    def _cache_result(self, key: bytes, rows: List[Dict[str, Any]]) -> None:
+        """Store a query result unless caching is off or it is too large to keep."""
+        if self.query_cache_ttl > 0 and len(rows) <= self.query_cache_max_rows:
+            with self._query_cache_lock:
+                self._query_cache[key] = rows
+    
+    def _cached_result(self, key: Optional[bytes]) -> Optional[List[Dict[str, Any]]]:
+        """Look up a query result in the metrics and the cache, returning None on a miss."""
+        if key is None:
+            return None
+        rows = self.metrics.lookup(key)
+        if rows is not None:
+            return rows
+        with self._query_cache_lock:
+            return self._query_cache.get(key)
+    
+    def invalidate_query_cache(self) -> None:
+        """Drop all cached query results, e.g. after data was modified."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+    
+    def execute_query(self, query: str, no_cache: bool = False,
+                      stream: bool = False) -> Tuple[bool, Any, str]:
         """
         Execute a SELECT query and return results.
+        By default the result is buffered by the driver and returned as a
+        list, which is quickest for small lookups. With stream=True the
+        rows come back as a RowStream read through a server-side cursor,
+        keeping client memory constant for large results.
         
         Args:
             query: SQL SELECT query to execute
+            no_cache: Skip the result cache and always query the database
+            stream: Return an iterator over an unbuffered cursor instead of a list
             
         Returns:
-            Tuple of (success: bool, data: list/None, message: str)
+            Tuple of (success: bool, data: list/iterator/None, message: str)
         """
-        connection = None
-        cursor = None
+        if stream:
+            return self.execute_query_stream(query, no_cache=no_cache)
+        
+        success, rows, message = self.execute_query_stream(query, no_cache=no_cache, buffered=True)
+        if not success:
+            return False, None, message
         
         try:
-            connection = self.get_connection()
-            if not connection or not connection.is_connected():
-                return False, None, "Failed to connect to database"
+            results = list(rows)
+        except DB_ERRORS as e:
+            error_message = f"Database error: {str(e)}"
+            logger.error("Database error: %s", e)
+            return False, None, error_message
+        finally:
+            rows.close()
+        
+        row_count = len(results)
+        return True, results, f"Query executed successfully. {row_count} rows returned."
+    
+    def execute_batch(self, queries: List[str]) -> Tuple[bool, Any, str]:
+        """
+        Execute several statements in a single round trip.
+        Only for trusted, module-internal queries (metrics, introspection):
+        the statements are joined into one multi-statement string, so
+        user-supplied SQL must never be passed here.
+        
+        mysqlclient connections do not enable multi-statements, so with that
+        driver the statements run one after another on one connection.
+        
+        Args:
+            queries: SQL statements to execute
             
-            # Use dictionary cursor for named column access
-            cursor = connection.cursor(dictionary=True)
+        Returns:
+            Tuple of (success: bool, data: list of row lists/None, message: str)
+        """
+        connection = self.get_connection()
+        if connection is None:
+            return False, None, "Failed to connect to database"
+        
+        results = []
+        try:
+            with connection, self._cursor(connection) as cursor:
+                if self.driver == 'mysqlclient':
+                    for query in queries:
+                        cursor.execute(query)
+                        results.append(list(map(_row_serializer(cursor), cursor.fetchall())))
+                else:
+                    joined = ";\n".join(q.strip().rstrip(';') for q in queries)
+                    for result in cursor.execute(joined, multi=True):
+                        rows = result.fetchall() if result.with_rows else []
+                        results.append(list(map(_row_serializer(result), rows)))
+        except DB_ERRORS as e:
+            error_message = f"Database error: {str(e)}"
+            logger.error("Database error: %s", e)
+            return False, None, error_message
+        
+        return True, results, f"Batch executed successfully. {len(results)} statements run."
+    
+    def execute_query_parallel(self, queries: List[str]) -> List[Tuple[bool, Any, str]]:
+        """
+        Execute independent SELECT queries at the same time, each on its own
+        pooled connection, so the total time is that of the slowest query.
+        
+        Args:
+            queries: SQL SELECT queries to execute
             
-            # Execute the query
-            cursor.execute(query)
+        Returns:
+            List of (success: bool, data: list/None, message: str), in query order
+        """
+        return list(self._executor.map(self.execute_query, queries))
+    
+    def _recurring_template(self, query: str) -> Optional[Tuple[str, tuple]]:
+        """
+        Split a query into template and params if its template has been
+        seen at least DB_PREPARE_MIN_USES times, so one-shot queries are
+        not prepared.
+        
+        Args:
+            query: SQL SELECT query
             
-            # Fetch all results
-            results = cursor.fetchall()
+        Returns:
+            Tuple of (template, params), or None to execute the query as-is
+        """
+        if not self.prepare_cache_size or query.lstrip()[:6].upper() != 'SELECT':
+            return None
+        split = _split_literals(query)
+        if split is None:
+            return None
+        with self._template_uses_lock:
+            if split[0] in self._unpreparable:
+                return None
+            uses = self._template_uses.get(split[0], 0) + 1
+            self._template_uses[split[0]] = uses
+        return split if uses >= self.prepare_min_uses else None
+    
+    def _prepared_cursor(self, connection, template: str):
+        """
+        Get the prepared cursor for a template on this connection, creating it
+        if needed. Each physical connection keeps an LRU of at most
+        DB_PREPARE_CACHE_SIZE cursors; evicted cursors are closed, which
+        deallocates their statements on the server.
+        
+        Args:
+            connection: Pooled connection from get_connection()
+            template: Query with ? placeholders
             
-            # Convert Decimal and datetime objects to JSON-serializable formats
-            serializable_results = []
-            for row in results:
-                serializable_row = {}
-                for key, value in row.items():
-                    if hasattr(value, '__float__'):
-                        # Handle Decimal types
-                        serializable_row[key] = float(value)
-                    elif hasattr(value, 'isoformat'):
-                        # Handle datetime/date types
-                        serializable_row[key] = value.isoformat()
-                    else:
-                        serializable_row[key] = value
-                serializable_results.append(serializable_row)
+        Returns:
+            Tuple of (prepared dictionary cursor, whether it was just created)
+        """
+        cnx = getattr(connection, '_cnx', connection)
+        statements = getattr(cnx, '_nl2sql_statements', None)
+        if statements is None:
+            statements = cnx._nl2sql_statements = OrderedDict()
+        
+        cursor = statements.get(template)
+        if cursor is not None:
+            statements.move_to_end(template)
+            return cursor, False
+        
+        cursor = cnx.cursor(prepared=True, dictionary=True)
+        statements[template] = cursor
+        if len(statements) > self.prepare_cache_size:
+            _, evicted = statements.popitem(last=False)
+            evicted.close()
+        return cursor, True
+    
+    @staticmethod
+    def _drop_statements(connection) -> None:
+        """Close and forget all prepared cursors of a connection."""
+        cnx = getattr(connection, '_cnx', connection)
+        statements = getattr(cnx, '_nl2sql_statements', None) or {}
+        cnx._nl2sql_statements = None
+        for cursor in statements.values():
+            try:
+                cursor.close()
+            except DB_ERRORS:
+                pass
+    
+    def _start_prepared(self, query: str) -> Optional[Tuple[Any, Any]]:
+        """
+        Start a recurring query through a cached server-side prepared
+        statement, so the server skips parsing and planning it again.
+        
+        If a cursor that was just prepared fails, its template is remembered
+        and never prepared again. If a cached one fails, the connection's
+        statements were most likely lost (e.g. the pool reconnected), so all
+        of them are dropped. Either way the caller runs the query normally
+        instead, which also reports genuine query errors.
+        
+        Args:
+            query: SQL SELECT query to execute
             
-            row_count = len(serializable_results)
-            return True, serializable_results, f"Query executed successfully. {row_count} rows returned."
+        Returns:
+            Tuple of (connection, prepared cursor with a pending result set),
+            or None if the query should be executed normally
+        """
+        split = self._recurring_template(query)
+        if split is None:
+            return None
+        template, params = split
+        
+        connection = self.get_connection()
+        if connection is None:
+            return None
+        
+        created = False
+        try:
+            cursor, created = self._prepared_cursor(connection, template)
+            cursor.execute(template, params)
+        except DB_ERRORS as e:
+            if created:
+                with self._template_uses_lock:
+                    self._unpreparable[template] = True
+                self._forget_statement(connection, template)
+            else:
+                self._drop_statements(connection)
+            connection.close()
+            logger.warning("Prepared statement failed, running query directly: %s", e)
+            return None
+        return connection, cursor
+    
+    @staticmethod
+    def _forget_statement(connection, template: str) -> None:
+        """Close and forget a connection's prepared cursor for one template."""
+        cnx = getattr(connection, '_cnx', connection)
+        statements = getattr(cnx, '_nl2sql_statements', None) or {}
+        cursor = statements.pop(template, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except DB_ERRORS:
+                pass
+    
+    def execute_query_columns(self, query: str) -> Tuple[bool, Any, str]:
+        """
+        Execute a SELECT query and return its result column by column.
+        Rows are fetched as tuples and transposed, so no dict is built per
+        row; only DECIMAL and TIME columns need converting for orjson.
+        Duplicate column names keep the last column of that name.
+        
+        Args:
+            query: SQL SELECT query to execute
             
-        except Error as e:
+        Returns:
+            Tuple of (success: bool, data: dict/None, message: str) where data is
+            {"columns": [names], "data": {name: [values]}, "row_count": int}
+        """
+        connection = self.get_connection()
+        if connection is None:
+            return False, None, "Failed to connect to database"
+        
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.execute(query)
+                rows = cursor.fetchall()
+                description = cursor.description
+        except DB_ERRORS as e:
             error_message = f"Database error: {str(e)}"
-            print(f"❌ {error_message}")
+            logger.error("Database error: %s", e)
             return False, None, error_message
         
-        finally:
+        names = [col[0] for col in description]
+        columns = zip(*rows) if rows else [()] * len(names)
+        data = {}
+        for name, col, values in zip(names, description, columns):
+            converter = _COLUMN_CONVERTERS.get(col[1])
+            if converter:
+                values = [None if v is None else converter(v) for v in values]
+            data[name] = values
+        
+        row_count = len(rows)
+        return True, {"columns": names, "data": data, "row_count": row_count}, \
+            f"Query executed successfully. {row_count} rows returned."
+    
+    def execute_query_stream(self, query: str, no_cache: bool = False,
+                             buffered: bool = False) -> Tuple[bool, Optional['RowStream'], str]:
+        """
+        Execute a SELECT query and stream its rows instead of loading them all.
+        Uses an unbuffered (server-side) cursor so rows are read from the
+        server as the caller consumes them. The connection is released once
+        the returned RowStream is exhausted or closed.
+        
+        The session's net_write_timeout is raised to DB_NET_WRITE_TIMEOUT
+        for every connection (see _session_init), so the server
+        does not drop the connection while a slow client is still reading
+        a large result.
+        
+        When QUERY_CACHE_TTL is set, results of SELECT queries are cached for
+        that many seconds (up to QUERY_CACHE_MAX_ROWS rows) and replayed from
+        memory on a hit.
+        
+        Args:
+            query: SQL SELECT query to execute
+            no_cache: Skip the result cache and always query the database
+            buffered: Read the whole result into the client up front
+            
+        Returns:
+            Tuple of (success: bool, rows: iterator/None, message: str)
+        """
+        cache_key = None if no_cache else self._query_cache_key(query)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return True, CachedRows(cached), "Query served from cache."
+        
+        on_complete = partial(self._cache_result, cache_key) if cache_key and self.query_cache_ttl > 0 else None
+        
+        prepared = self._start_prepared(query)
+        if prepared is not None:
+            connection, cursor = prepared
+            rows = RowStream(connection, cursor, on_complete=on_complete,
+                             collect_limit=self.query_cache_max_rows, keep_cursor=True)
+            return True, rows, "Query started successfully."
+        
+        connection = self.get_connection()
+        if connection is None:
+            return False, None, "Failed to connect to database"
+        
+        cursor = None
+        try:
+            cursor = self._cursor(connection, stream=not buffered)
+            cursor.execute(query)
+            
+        except DB_ERRORS as e:
             if cursor:
                 cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+            connection.close()
+            error_message = f"Database error: {str(e)}"
+            logger.error("Database error: %s", e)
+            return False, None, error_message
+        
+        rows = RowStream(connection, cursor, on_complete=on_complete,
+                         collect_limit=self.query_cache_max_rows)
+        return True, rows, "Query started successfully."
+    
+    def _schema_fresh(self) -> bool:
+        """Check whether the cached schema is still within its TTL."""
+        return (self._schema_cache is not None
+                and time.monotonic() - self._schema_cache_ts < self._schema_ttl)
+    
+    def _async_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the event loop that owns the asyncmy pool, starting its thread
+        on first use. The pool is bound to this loop, so it is never used
+        from the short-lived loops of individual requests.
+        
+        Returns:
+            Event loop running in a daemon thread
+        """
+        if self._aloop is None:
+            with self._aloop_lock:
+                if self._aloop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='nl2sql-db-async', daemon=True).start()
+                    self._aloop = loop
+        return self._aloop
+    
+    async def _on_async_loop(self, coro):
+        """
+        Await a coroutine on the pool's event loop, from any event loop.
+        
+        Args:
+            coro: Coroutine that uses the asyncmy pool
+            
+        Returns:
+            The coroutine's result
+        """
+        loop = self._async_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    
+    async def _get_async_pool(self):
+        """
+        Get the asyncmy pool, creating it on first use.
+        Must run on the pool's event loop (see _on_async_loop). Concurrent
+        callers share the same creation task.
+        
+        Returns:
+            asyncmy connection pool
+        """
+        if self._apool_task is None:
+            self._apool_task = asyncio.get_running_loop().create_task(asyncmy.create_pool(
+                minsize=min(self.pool_min, self.async_pool_size),
+                maxsize=self.async_pool_size,
+                **self._driver_config()
+            ))
+        try:
+            return await self._apool_task
+        except BaseException:
+            self._apool_task = None
+            raise
+    
+    async def _close_async_pool(self) -> None:
+        """Close the asyncmy pool; runs on the pool's event loop."""
+        task, self._apool_task = self._apool_task, None
+        if task is not None and task.done() and not task.exception():
+            pool = task.result()
+            pool.close()
+            await pool.wait_closed()
+    
+    async def aclose(self) -> None:
+        """Close the asyncmy pool if one is open, e.g. at shutdown."""
+        if self._aloop is not None:
+            await self._on_async_loop(self._close_async_pool())
+    
+    async def aexecute_query(self, query: str) -> Tuple[bool, Any, str]:
+        """
+        Execute a SELECT query without blocking the event loop.
+        Uses the asyncmy pool when asyncmy is installed, otherwise runs
+        execute_query in a worker thread.
+        
+        Args:
+            query: SQL SELECT query to execute
+            
+        Returns:
+            Tuple of (success: bool, data: list/None, message: str)
+        """
+        if asyncmy is None:
+            return await asyncio.to_thread(self.execute_query, query)
+        return await self._on_async_loop(self._aexecute_query(query))
+    
+    async def _aexecute_query(self, query: str) -> Tuple[bool, Any, str]:
+        """aexecute_query on the asyncmy pool; runs on the pool's event loop."""
+        cache_key = self._query_cache_key(query)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            return True, list(cached), f"Query executed successfully. {len(cached)} rows returned."
+        
+        try:
+            pool = await self._get_async_pool()
+            async with pool.acquire() as connection:
+                async with connection.cursor(AsyncDictCursor) as cursor:
+                    await cursor.execute(query)
+                    results = await cursor.fetchall()
+                    serialize = _row_serializer(cursor)
+        except DB_ERRORS as e:
+            error_message = f"Database error: {str(e)}"
+            logger.error("Database error: %s", e)
+            return False, None, error_message
+        
+        serializable_results = list(map(serialize, results))
+        if cache_key:
+            self._cache_result(cache_key, serializable_results)
+        row_count = len(serializable_results)
+        return True, serializable_results, f"Query executed successfully. {row_count} rows returned."
+    
+    async def aexecute_query_batch(self, queries: List[str]) -> List[Tuple[bool, Any, str]]:
+        """
+        Execute several SELECT queries concurrently.
+        The async pool stays open, so later batches reuse its connections.
+        
+        Args:
+            queries: SQL SELECT queries to execute
+            
+        Returns:
+            List of (success: bool, data: list/None, message: str), in query order
+        """
+        return await asyncio.gather(*[self.aexecute_query(q) for q in queries])
     
     def get_table_schema(self) -> Dict[str, List[Dict[str, str]]]:
         """
         Get the schema of all tables in the database.
         Useful for providing context to the AI model.
+        The result is cached for SCHEMA_TTL seconds; failed lookups
+        are not cached so the next call retries.
         
         Returns:
             Dictionary with table names as keys and column info as values
         """
-        connection = None
-        cursor = None
-        schema = {}
+        with self._schema_lock:
+            if self._schema_fresh():
+                return self._schema_cache
+            
+            schema = self._fetch_table_schema()
+            if schema:
+                self._schema_cache = schema
+                self._schema_cache_ts = time.monotonic()
+                self._schema_description = None
+                self._schema_hash = None
+            return schema
+    
+    def _fetch_table_schema(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Query the database for the schema of all tables.
+        
+        Returns:
+            Dictionary with table names as keys and column info as values
+        """
+        connection = self.get_connection()
+        if connection is None:
+            return {}
         
         try:
-            connection = self.get_connection()
-            if not connection or not connection.is_connected():
-                return schema
-            
-            cursor = connection.cursor(dictionary=True)
-            
-            # Get all tables
-            cursor.execute("SHOW TABLES")
-            tables = cursor.fetchall()
-            
-            # Get column info for each table
-            for table_row in tables:
-                table_name = list(table_row.values())[0]
-                cursor.execute(f"DESCRIBE {table_name}")
+            with connection, self._cursor(connection) as cursor:
+                # Fetch every column of every table in one round trip
+                cursor.execute(
+                    "SELECT TABLE_NAME AS table_name, COLUMN_NAME AS name, "
+                    "COLUMN_TYPE AS type, IS_NULLABLE AS nullable, "
+                    "COLUMN_KEY AS `key`, COLUMN_DEFAULT AS `default` "
+                    "FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = %s "
+                    "ORDER BY TABLE_NAME, ORDINAL_POSITION",
+                    (self.config['database'],)
+                )
                 columns = cursor.fetchall()
-                schema[table_name] = [
-                    {
-                        'name': col['Field'],
-                        'type': col['Type'],
-                        'nullable': col['Null'] == 'YES',
-                        'key': col['Key'],
-                        'default': col['Default']
-                    }
-                    for col in columns
-                ]
-            
-            return schema
-            
-        except Error as e:
-            print(f"❌ Error getting schema: {e}")
-            return schema
+        except DB_ERRORS as e:
+            logger.error("Error getting schema: %s", e)
+            return {}
         
-        finally:
-            if cursor:
-                cursor.close()
-            if connection and connection.is_connected():
-                connection.close()
+        columns_by_table = defaultdict(list)
+        for col in columns:
+            columns_by_table[col['table_name']].append({
+                'name': col['name'],
+                'type': col['type'],
+                'nullable': col['nullable'] == 'YES',
+                'key': col['key'],
+                'default': col['default']
+            })
+        return dict(columns_by_table)
     
     def get_schema_description(self) -> str:
         """
         Get a human-readable description of the database schema.
-        Used as context for the AI model.
+        Used as context for the AI model. The rendered string is cached
+        together with the schema it was built from.
         
         Returns:
             String description of the schema
         """
-        schema = self.get_table_schema()
+        return self.get_schema_fingerprint()[0]
+    
+    def get_schema_fingerprint(self) -> Tuple[str, Optional[str]]:
+        """
+        Get the schema description together with its fingerprint.
+        The description is hashed once per fetch, so callers can key
+        caches on it without re-hashing.
         
-        if not schema:
-            return "Unable to retrieve database schema."
+        Returns:
+            Tuple of (schema description: str, blake2b hex digest or None on failure)
+        """
+        with self._schema_lock:
+            schema = self.get_table_schema()
+            if not schema:
+                return "Unable to retrieve database schema.", None
+            
+            if self._schema_description is None:
+                self._schema_description = self._render_schema(schema) + self.metrics.describe()
+                self._schema_hash = hashlib.blake2b(
+                    self._schema_description.encode(), digest_size=16
+                ).hexdigest()
+            return self._schema_description, self._schema_hash
+    
+    def get_schema_hash(self) -> Optional[str]:
+        """Get the fingerprint of the cached schema description, if any."""
+        with self._schema_lock:
+            return self._schema_hash
+    
+    def invalidate_schema_description(self) -> None:
+        """Re-render the schema description on next use, keeping the fetched schema."""
+        with self._schema_lock:
+            self._schema_description = None
+            self._schema_hash = None
+    
+    def invalidate_schema(self) -> None:
+        """Drop the cached schema so the next lookup queries the database."""
+        with self._schema_lock:
+            self._schema_cache = None
+            self._schema_cache_ts = 0.0
+            self._schema_description = None
+            self._schema_hash = None
+    
+    @staticmethod
+    def _render_schema(schema: Dict[str, List[Dict[str, str]]]) -> str:
+        """
+        Render a schema dict as the text given to the AI model.
+        Written into a single StringIO buffer; called once per schema
+        fetch, the result is cached by get_schema_fingerprint.
         
-        description_parts = ["Database Schema:\n"]
+        Args:
+            schema: Dictionary returned by get_table_schema
+            
+        Returns:
+            String description of the schema
+        """
+        buf = io.StringIO()
+        buf.write("Database Schema:\n")
         
         for table_name, columns in schema.items():
-            description_parts.append(f"\nTable: {table_name}")
-            description_parts.append("Columns:")
+            buf.write(f"\n\nTable: {table_name}\nColumns:")
             for col in columns:
-                col_desc = f"  - {col['name']} ({col['type']})"
-                if col['key'] == 'PRI':
-                    col_desc += " [PRIMARY KEY]"
-                elif col['key'] == 'MUL':
-                    col_desc += " [FOREIGN KEY]"
-                description_parts.append(col_desc)
+                buf.write(f"\n  - {col['name']} ({col['type']})")
+                buf.write(_KEY_MARKERS.get(col['key'], ""))
         
-        return "\n".join(description_parts)
+        return buf.getvalue()
 
 
-# Create a singleton instance for use across the application
-db_manager = DatabaseManager()
+# Shared instance, created on first use so importing this module does not
+# open database connections
+_db_manager: Optional[DatabaseManager] = None
+_db_manager_lock = threading.Lock()
+
+# Instances inherited from a parent process. They are kept referenced but
+# never used: their sockets belong to the parent's sessions, and letting
+# them be garbage-collected could close those sessions.
+_inherited_managers: List[DatabaseManager] = []
+
+
+def get_db() -> DatabaseManager:
+    """
+    Get the shared DatabaseManager instance, creating it on first use.
+    
+    Returns:
+        DatabaseManager singleton
+    """
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
+    return _db_manager
+
+
+def _reset_after_fork() -> None:
+    """Make a forked child build its own pool instead of sharing the parent's sockets."""
+    global _db_manager, _db_manager_lock
+    if _db_manager is not None:
+        _inherited_managers.append(_db_manager)
+    _db_manager = None
+    _db_manager_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 # ============================================
@@ -239,17 +1444,85 @@ db_manager = DatabaseManager()
 
 def test_db_connection() -> Tuple[bool, str]:
     """Test database connection."""
-    return db_manager.test_connection()
+    return get_db().test_connection()
 
 
-def execute_sql(query: str) -> Tuple[bool, Any, str]:
+def execute_sql(query: str, stream: bool = False) -> Tuple[bool, Any, str]:
     """Execute a SQL query."""
-    return db_manager.execute_query(query)
+    return get_db().execute_query(query, stream=stream)
+
+
+def execute_sql_parallel(queries: List[str]) -> List[Tuple[bool, Any, str]]:
+    """Execute several independent SQL queries in parallel."""
+    return get_db().execute_query_parallel(queries)
+
+
+def execute_sql_columns(query: str) -> Tuple[bool, Any, str]:
+    """Execute a SQL query and return its result column by column."""
+    return get_db().execute_query_columns(query)
+
+
+def execute_sql_stream(query: str) -> Tuple[bool, Optional[RowStream], str]:
+    """Execute a SQL query and stream its rows."""
+    return get_db().execute_query_stream(query)
+
+
+def execute_sql_batch(queries: List[str]) -> List[Tuple[bool, Any, str]]:
+    """Execute several SQL queries concurrently."""
+    return asyncio.run(get_db().aexecute_query_batch(queries))
+
+
+def invalidate_query_cache() -> None:
+    """Drop all cached query results."""
+    get_db().invalidate_query_cache()
+
+
+def register_metric(name: str, sql: str, ttl: float = 300) -> None:
+    """Register a precomputed metric."""
+    get_db().metrics.register_metric(name, sql, ttl)
+
+
+def get_metrics_snapshot() -> Dict[str, Any]:
+    """Get the current value of every precomputed metric."""
+    return get_db().metrics.metrics_snapshot()
 
 
 def get_schema_context() -> str:
-    """Get schema description for AI context."""
-    return db_manager.get_schema_description()
+    """Get schema description for AI context, cached for SCHEMA_TTL seconds."""
+    return get_db().get_schema_description()
+
+
+# ============================================
+# Cached schema context
+# ============================================
+
+def get_schema_fingerprint() -> Tuple[str, Optional[str]]:
+    """
+    Get the cached schema description together with its fingerprint.
+    
+    Returns:
+        Tuple of (schema description: str, blake2b hex digest or None on failure)
+    """
+    return get_db().get_schema_fingerprint()
+
+
+def get_schema_hash() -> Optional[str]:
+    """Get the fingerprint of the cached schema description, if any."""
+    return get_db().get_schema_hash()
+
+
+def refresh_schema_context() -> str:
+    """
+    Drop the cached schema description and fetch it again.
+    Cached query results are dropped too, since the tables may have changed.
+    
+    Returns:
+        String description of the schema
+    """
+    db = get_db()
+    db.invalidate_schema()
+    db.invalidate_query_cache()
+    return db.get_schema_description()
 
 
 def execute_manual_sql(query: str) -> Tuple[bool, Any, str]:
@@ -263,46 +1536,36 @@ def execute_manual_sql(query: str) -> Tuple[bool, Any, str]:
     Returns:
         Tuple of (success: bool, data: list/None, message: str)
     """
-    connection = None
-    cursor = None
+    db = get_db()
+    connection = db.get_connection()
+    if connection is None:
+        return False, None, "Failed to connect to database"
     
-    try:
-        connection = db_manager.get_connection()
-        if not connection or not connection.is_connected():
-            return False, None, "Failed to connect to database"
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Execute the query
-        cursor.execute(query)
-        
-        # Check if it's a SELECT query (has results)
-        query_type = query.strip().upper().split()[0]
-        
-        if query_type == 'SELECT':
-            # Fetch results for SELECT queries
-            results = cursor.fetchall()
-            
-            # Convert to JSON-serializable format
-            serializable_results = []
-            for row in results:
-                serializable_row = {}
-                for key, value in row.items():
-                    if hasattr(value, '__float__'):
-                        serializable_row[key] = float(value)
-                    elif hasattr(value, 'isoformat'):
-                        serializable_row[key] = value.isoformat()
-                    else:
-                        serializable_row[key] = value
-                serializable_results.append(serializable_row)
+    with connection:
+        try:
+            with db._cursor(connection) as cursor:
+                # Execute the query
+                cursor.execute(query)
+                
+                # Check if it's a SELECT query (has results)
+                query_type = query.strip().upper().split()[0]
+                
+                if query_type == 'SELECT':
+                    # Fetch results for SELECT queries
+                    results = cursor.fetchall()
+                    
+                    # Convert to JSON-serializable format
+                    serializable_results = list(map(_row_serializer(cursor), results))
+                    
+                    row_count = len(serializable_results)
+                    return True, serializable_results, f"Query executed successfully. {row_count} rows returned."
+                
+                # For INSERT, UPDATE, DELETE - commit and return affected rows
+                connection.commit()
+                affected_rows = cursor.rowcount
             
-            row_count = len(serializable_results)
-            return True, serializable_results, f"Query executed successfully. {row_count} rows returned."
-        
-        else:
-            # For INSERT, UPDATE, DELETE - commit and return affected rows
-            connection.commit()
-            affected_rows = cursor.rowcount
+            # Cached SELECT results may no longer match the data
+            db.invalidate_query_cache()
             
             if query_type == 'INSERT':
                 message = f"Successfully inserted {affected_rows} row(s)."
@@ -316,18 +1579,11 @@ def execute_manual_sql(query: str) -> Tuple[bool, Any, str]:
             # For non-SELECT queries, return empty list but with success message
             return True, [], message
             
-    except Error as e:
-        if connection:
+        except DB_ERRORS as e:
             connection.rollback()
-        error_message = f"Database error: {str(e)}"
-        print(f"❌ {error_message}")
-        return False, None, error_message
-    
-    finally:
-        if cursor:
-            cursor.close()
-        if connection and connection.is_connected():
-            connection.close()
+            error_message = f"Database error: {str(e)}"
+            logger.error("Database error: %s", e)
+            return False, None, error_message
 
 
 
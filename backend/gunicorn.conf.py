@@ -0,0 +1,66 @@
+"""
+============================================
+Gunicorn Configuration
+============================================
+Production server settings for the Flask API. Run from the backend
+directory with:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Threaded workers let each process keep many slow LLM requests in
+flight at once instead of serving them one at a time. Gevent workers
+are not the default because the MySQL C extension does blocking I/O
+that gevent cannot switch away from, which would stall every request
+in the worker during a query.
+
+Author: AI Integration Project
+"""
+
+import os
+import multiprocessing
+from importlib.util import find_spec
+
+# Address and port to listen on
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}"
+
+# Every worker opens its own MySQL pool (plus the async pool when asyncmy
+# is installed), so by default run one worker per CPU core only as far as
+# their connections fit in DB_MAX_CONNECTIONS (MySQL's max_connections,
+# 151 by default), keeping a fifth of it for other clients
+_connections_per_worker = int(os.getenv('DB_POOL_SIZE', 20))
+if find_spec('asyncmy'):
+    _connections_per_worker += int(os.getenv('DB_ASYNC_POOL_MAX', 20))
+_connection_budget = int(os.getenv('DB_MAX_CONNECTIONS', 151)) * 4 // 5
+workers = int(os.getenv('WEB_CONCURRENCY', 0)) or min(
+    multiprocessing.cpu_count(),
+    max(1, _connection_budget // max(_connections_per_worker, 1))
+)
+
+# Threaded workers: requests waiting on the network or database run side by side
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+# Each thread may hold a pooled MySQL connection (streamed responses keep
+# theirs until the body is sent), so default to one thread per connection
+threads = int(os.getenv('GUNICORN_THREADS', os.getenv('DB_POOL_SIZE', 20)))
+
+# Only used with GUNICORN_WORKER_CLASS=gevent (needs the gevent package)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 500))
+
+# LLM calls can take several seconds; allow headroom before killing a worker
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+# Keep connections from the React frontend warm between requests
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 30))
+
+
+def post_worker_init(worker):
+    """
+    Build the worker's connection pool and schema context before it accepts
+    requests, so the first request does not pay for them. Runs after the
+    fork, so every worker gets its own connections.
+    """
+    import db
+    
+    db.get_db()
+    _, schema_hash = db.get_schema_fingerprint()
+    if schema_hash is None:
+        worker.log.warning("Schema context not loaded at startup; retrying on first request")
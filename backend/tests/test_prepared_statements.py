@@ -0,0 +1,172 @@
+"""
+============================================
+Tests for the prepared statement path
+============================================
+Run from the backend directory with:
+
+    python -m unittest discover tests
+
+Author: AI Integration Project
+"""
+
+import threading
+import unittest
+from decimal import Decimal
+
+from cachetools import LRUCache
+from mysql.connector import Error
+
+import db
+
+
+class FakeCursor:
+    """Prepared cursor stand-in serving rows from a list."""
+
+    def __init__(self, rows=(), fail=False):
+        self.description = [('id', 3)]
+        self.rows = list(rows)
+        self.fail = fail
+        self.executed = []
+        self.resets = 0
+        self.closed = False
+
+    def execute(self, operation, params=()):
+        if self.fail:
+            raise Error("statement failed")
+        self.executed.append((operation, params))
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """Pooled connection stand-in handing out FakeCursors."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.cursors = []
+        self.closed = 0
+
+    def cursor(self, prepared=False, dictionary=False):
+        cursor = FakeCursor(rows=[{'id': 1}], fail=self.fail)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed += 1
+
+
+def make_manager(connection):
+    """DatabaseManager with just the prepared statement state set up."""
+    manager = db.DatabaseManager.__new__(db.DatabaseManager)
+    manager.prepare_cache_size = 4
+    manager.prepare_min_uses = 1
+    manager._template_uses = LRUCache(maxsize=16)
+    manager._template_uses_lock = threading.Lock()
+    manager._unpreparable = LRUCache(maxsize=16)
+    manager.get_connection = lambda: connection
+    return manager
+
+
+@unittest.skipIf(db.sqlglot is None, "sqlglot is not installed")
+class SplitLiteralsTest(unittest.TestCase):
+
+    def test_lifts_filter_values(self):
+        template, params = db._split_literals(
+            "SELECT * FROM employees WHERE salary > 5000 AND name LIKE 'A%' AND dept_id IN (1, 2)"
+        )
+        self.assertEqual(template, "SELECT * FROM employees WHERE salary > ? AND name LIKE ? AND dept_id IN (?, ?)")
+        self.assertEqual(params, (5000, 'A%', 1, 2))
+
+    def test_decimal_literal(self):
+        self.assertEqual(db._split_literals("SELECT * FROM t WHERE x = 1.5")[1], (Decimal('1.5'),))
+
+    def test_keeps_data_type_and_function_arguments(self):
+        template, params = db._split_literals(
+            "SELECT * FROM t WHERE CAST(x AS DECIMAL(10,2)) > 5 AND ROUND(y, 2) = 3"
+        )
+        self.assertIn("DECIMAL(10, 2)", template)
+        self.assertIn("ROUND(y, 2)", template)
+        self.assertEqual(params, (5, 3))
+
+    def test_keeps_limit_and_order(self):
+        template, params = db._split_literals("SELECT a FROM t WHERE a = 1 ORDER BY 1 LIMIT 10")
+        self.assertEqual(template, "SELECT a FROM t WHERE a = ? ORDER BY 1 LIMIT 10")
+        self.assertEqual(params, (1,))
+
+    def test_nothing_to_lift(self):
+        self.assertIsNone(db._split_literals("SELECT * FROM t WHERE a = b"))
+        self.assertIsNone(db._split_literals("SELECT 1 FROM t"))
+
+
+class KeptCursorRowStreamTest(unittest.TestCase):
+
+    def test_exhausted_stream_keeps_cursor(self):
+        connection = FakeConnection()
+        cursor = FakeCursor(rows=[{'id': 1}, {'id': 2}])
+        stream = db.RowStream(connection, cursor, keep_cursor=True)
+        self.assertEqual(list(stream), [{'id': 1}, {'id': 2}])
+        self.assertFalse(cursor.closed)
+        self.assertEqual(cursor.resets, 0)
+        self.assertEqual(connection.closed, 1)
+
+    def test_early_close_resets_cursor(self):
+        connection = FakeConnection()
+        cursor = FakeCursor(rows=[{'id': 1}, {'id': 2}])
+        stream = db.RowStream(connection, cursor, batch_size=1, keep_cursor=True)
+        next(stream)
+        stream.close()
+        self.assertFalse(cursor.closed)
+        self.assertEqual(cursor.resets, 1)
+        self.assertEqual(connection.closed, 1)
+
+
+@unittest.skipIf(db.sqlglot is None, "sqlglot is not installed")
+class StartPreparedTest(unittest.TestCase):
+
+    query = "SELECT * FROM t WHERE a = 1"
+
+    def test_reuses_cursor_per_template(self):
+        connection = FakeConnection()
+        manager = make_manager(connection)
+        _, first = manager._start_prepared(self.query)
+        _, second = manager._start_prepared("SELECT * FROM t WHERE a = 2")
+        self.assertIs(first, second)
+        self.assertEqual(first.executed, [("SELECT * FROM t WHERE a = ?", (1,)), ("SELECT * FROM t WHERE a = ?", (2,))])
+
+    def test_failing_template_is_not_retried(self):
+        connection = FakeConnection(fail=True)
+        manager = make_manager(connection)
+        self.assertIsNone(manager._start_prepared(self.query))
+        self.assertTrue(connection.cursors[0].closed)
+        self.assertIsNone(manager._start_prepared(self.query))
+        self.assertEqual(len(connection.cursors), 1)
+
+    def test_failing_new_template_keeps_other_statements(self):
+        connection = FakeConnection()
+        manager = make_manager(connection)
+        _, cached = manager._start_prepared(self.query)
+        connection.fail = True
+        self.assertIsNone(manager._start_prepared("SELECT * FROM u WHERE b = 1"))
+        self.assertFalse(cached.closed)
+        self.assertIn("SELECT * FROM t WHERE a = ?", connection._nl2sql_statements)
+
+    def test_failing_cached_statement_drops_all(self):
+        connection = FakeConnection()
+        manager = make_manager(connection)
+        _, cached = manager._start_prepared(self.query)
+        cached.fail = True
+        self.assertIsNone(manager._start_prepared(self.query))
+        self.assertTrue(cached.closed)
+        self.assertIsNone(connection._nl2sql_statements)
+
+
+if __name__ == '__main__':
+    unittest.main()
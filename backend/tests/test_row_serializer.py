@@ -0,0 +1,97 @@
+"""
+============================================
+Tests for the generated row serializers
+============================================
+Run from the backend directory with:
+
+    python -m unittest discover tests
+
+Author: AI Integration Project
+"""
+
+import datetime
+import unittest
+from decimal import Decimal
+
+import db
+
+
+class FakeCursor:
+    """Cursor stand-in exposing only a description."""
+
+    def __init__(self, description):
+        self.description = description
+
+
+class BuildRowSerializerTest(unittest.TestCase):
+
+    def test_converts_typed_columns(self):
+        serialize = db._build_row_serializer((
+            ('id', 3), ('salary', 246), ('hired', 10), ('updated', 12), ('shift', 11), ('name', 253)
+        ))
+        row = {
+            'id': 1,
+            'salary': Decimal('75000.50'),
+            'hired': datetime.date(2020, 1, 2),
+            'updated': datetime.datetime(2024, 5, 6, 7, 8, 9),
+            'shift': datetime.timedelta(hours=9),
+            'name': 'Alice'
+        }
+        self.assertEqual(serialize(row), {
+            'id': 1,
+            'salary': 75000.5,
+            'hired': '2020-01-02',
+            'updated': '2024-05-06T07:08:09',
+            'shift': '9:00:00',
+            'name': 'Alice'
+        })
+
+    def test_nulls_pass_through(self):
+        serialize = db._build_row_serializer((('salary', 0), ('hired', 7), ('shift', 11)))
+        row = {'salary': None, 'hired': None, 'shift': None}
+        self.assertEqual(serialize(row), row)
+
+    def test_unexpected_value_types_pass_through(self):
+        # mysqlclient returns zero dates as strings
+        serialize = db._build_row_serializer((('hired', 10), ('salary', 246)))
+        row = {'hired': '0000-00-00', 'salary': 'n/a'}
+        self.assertEqual(serialize(row), row)
+
+    def test_quoted_column_names(self):
+        serialize = db._build_row_serializer((("it's", 246), ('a"b', 253)))
+        self.assertEqual(serialize({"it's": Decimal('1.5'), 'a"b': 'x'}), {"it's": 1.5, 'a"b': 'x'})
+
+    def test_cached_per_shape(self):
+        columns = (('id', 3), ('salary', 246))
+        self.assertIs(db._build_row_serializer(columns), db._build_row_serializer(columns))
+
+
+class RowSerializerTest(unittest.TestCase):
+
+    def test_no_description_uses_generic_serializer(self):
+        self.assertIs(db._row_serializer(FakeCursor(None)), db._serialize_row)
+
+    def test_repeated_names_keep_every_driver_key(self):
+        # mysqlclient and asyncmy key the second "name" as "d.name"
+        serialize = db._row_serializer(FakeCursor([('name', 253), ('name', 253), ('budget', 246)]))
+        row = {'name': 'Alice', 'd.name': 'Engineering', 'budget': Decimal('10.5')}
+        self.assertEqual(serialize(row), {'name': 'Alice', 'd.name': 'Engineering', 'budget': 10.5})
+
+    def test_repeated_names_use_the_value_type(self):
+        # mysql-connector keeps the last column of a repeated name
+        serialize = db._row_serializer(FakeCursor([('hired', 10), ('hired', 253)]))
+        self.assertEqual(serialize({'hired': 'abc'}), {'hired': 'abc'})
+
+    def test_matches_generic_serializer(self):
+        description = [('id', 3), ('salary', 246), ('hired', 10), ('shift', 11)]
+        row = {
+            'id': 7,
+            'salary': Decimal('3.25'),
+            'hired': datetime.date(2021, 3, 4),
+            'shift': datetime.timedelta(minutes=90)
+        }
+        self.assertEqual(db._row_serializer(FakeCursor(description))(row), db._serialize_row(row))
+
+
+if __name__ == '__main__':
+    unittest.main()